@@ -1,160 +1,1185 @@
+import array
 import base64
 import binascii 
-import codecs
+import collections
+import concurrent.futures
 import copy
+import functools
+import heapq
+import mmap
+import multiprocessing
+import os
 import random
+import struct
+import threading
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# bytes processed per step by xorBytes, rounded down to a multiple of the key length
+XOR_CHUNK = 1 << 16
+# below this size numpy's call overhead outweighs the vectorized loop
+XOR_NUMPY_THRESHOLD = 1 << 12
+# encoded bytes read from disk per step by Binary.iterFile
+FILE_CHUNK = 1 << 20
+# random bytes generated per refill of a RandomPool
+RANDOM_CHUNK = 1 << 16
+# distinct keys whose schedules are kept by cachedKeySchedule
+KEY_CACHE_SIZE = 256
+# input bytes per shard of Crypto.runFileJob, a multiple of the AES block
+SHARD_SIZE = 1 << 22
+# keystream blocks generated (and cached) together by AESCounter
+CTR_BATCH = 256
+# records scored per task by Crypto.detectSingleCharXOR
+CORPUS_CHUNK = 1 << 12
+# distinct bytes above which a record is not taken for single-byte XORed text
+XOR_MAX_DISTINCT = 80
+# relative score within which a longer XOR key only repeats a shorter one
+XOR_SIZE_TOLERANCE = 0.02
+# blocks packed into each wire by bitslicedEncrypt
+BITSLICE_BATCH = 1024
+# inputs (in bytes) from which aesEncrypt/aesDecrypt leave the per-block loop
+# for the numpy engine, or for bitslicedEncrypt without numpy
+AES_NUMPY_THRESHOLD = 1 << 9
+BITSLICE_THRESHOLD = 1 << 12
+
+SBOX = [
+    0x63, 0x7C, 0x77, 0x7B, 0xF2, 0x6B, 0x6F, 0xC5, 0x30, 0x01, 0x67, 0x2B, 0xFE, 0xD7, 0xAB, 0x76,
+    0xCA, 0x82, 0xC9, 0x7D, 0xFA, 0x59, 0x47, 0xF0, 0xAD, 0xD4, 0xA2, 0xAF, 0x9C, 0xA4, 0x72, 0xC0,
+    0xB7, 0xFD, 0x93, 0x26, 0x36, 0x3F, 0xF7, 0xCC, 0x34, 0xA5, 0xE5, 0xF1, 0x71, 0xD8, 0x31, 0x15,
+    0x04, 0xC7, 0x23, 0xC3, 0x18, 0x96, 0x05, 0x9A, 0x07, 0x12, 0x80, 0xE2, 0xEB, 0x27, 0xB2, 0x75,
+    0x09, 0x83, 0x2C, 0x1A, 0x1B, 0x6E, 0x5A, 0xA0, 0x52, 0x3B, 0xD6, 0xB3, 0x29, 0xE3, 0x2F, 0x84,
+    0x53, 0xD1, 0x00, 0xED, 0x20, 0xFC, 0xB1, 0x5B, 0x6A, 0xCB, 0xBE, 0x39, 0x4A, 0x4C, 0x58, 0xCF,
+    0xD0, 0xEF, 0xAA, 0xFB, 0x43, 0x4D, 0x33, 0x85, 0x45, 0xF9, 0x02, 0x7F, 0x50, 0x3C, 0x9F, 0xA8,
+    0x51, 0xA3, 0x40, 0x8F, 0x92, 0x9D, 0x38, 0xF5, 0xBC, 0xB6, 0xDA, 0x21, 0x10, 0xFF, 0xF3, 0xD2,
+    0xCD, 0x0C, 0x13, 0xEC, 0x5F, 0x97, 0x44, 0x17, 0xC4, 0xA7, 0x7E, 0x3D, 0x64, 0x5D, 0x19, 0x73,
+    0x60, 0x81, 0x4F, 0xDC, 0x22, 0x2A, 0x90, 0x88, 0x46, 0xEE, 0xB8, 0x14, 0xDE, 0x5E, 0x0B, 0xDB,
+    0xE0, 0x32, 0x3A, 0x0A, 0x49, 0x06, 0x24, 0x5C, 0xC2, 0xD3, 0xAC, 0x62, 0x91, 0x95, 0xE4, 0x79,
+    0xE7, 0xC8, 0x37, 0x6D, 0x8D, 0xD5, 0x4E, 0xA9, 0x6C, 0x56, 0xF4, 0xEA, 0x65, 0x7A, 0xAE, 0x08,
+    0xBA, 0x78, 0x25, 0x2E, 0x1C, 0xA6, 0xB4, 0xC6, 0xE8, 0xDD, 0x74, 0x1F, 0x4B, 0xBD, 0x8B, 0x8A,
+    0x70, 0x3E, 0xB5, 0x66, 0x48, 0x03, 0xF6, 0x0E, 0x61, 0x35, 0x57, 0xB9, 0x86, 0xC1, 0x1D, 0x9E,
+    0xE1, 0xF8, 0x98, 0x11, 0x69, 0xD9, 0x8E, 0x94, 0x9B, 0x1E, 0x87, 0xE9, 0xCE, 0x55, 0x28, 0xDF,
+    0x8C, 0xA1, 0x89, 0x0D, 0xBF, 0xE6, 0x42, 0x68, 0x41, 0x99, 0x2D, 0x0F, 0xB0, 0x54, 0xBB, 0x16
+]
+
+SBOX_INV = [
+    0x52, 0x09, 0x6A, 0xD5, 0x30, 0x36, 0xA5, 0x38, 0xBF, 0x40, 0xA3, 0x9E, 0x81, 0xF3, 0xD7, 0xFB,
+    0x7C, 0xE3, 0x39, 0x82, 0x9B, 0x2F, 0xFF, 0x87, 0x34, 0x8E, 0x43, 0x44, 0xC4, 0xDE, 0xE9, 0xCB,
+    0x54, 0x7B, 0x94, 0x32, 0xA6, 0xC2, 0x23, 0x3D, 0xEE, 0x4C, 0x95, 0x0B, 0x42, 0xFA, 0xC3, 0x4E,
+    0x08, 0x2E, 0xA1, 0x66, 0x28, 0xD9, 0x24, 0xB2, 0x76, 0x5B, 0xA2, 0x49, 0x6D, 0x8B, 0xD1, 0x25,
+    0x72, 0xF8, 0xF6, 0x64, 0x86, 0x68, 0x98, 0x16, 0xD4, 0xA4, 0x5C, 0xCC, 0x5D, 0x65, 0xB6, 0x92,
+    0x6C, 0x70, 0x48, 0x50, 0xFD, 0xED, 0xB9, 0xDA, 0x5E, 0x15, 0x46, 0x57, 0xA7, 0x8D, 0x9D, 0x84,
+    0x90, 0xD8, 0xAB, 0x00, 0x8C, 0xBC, 0xD3, 0x0A, 0xF7, 0xE4, 0x58, 0x05, 0xB8, 0xB3, 0x45, 0x06,
+    0xD0, 0x2C, 0x1E, 0x8F, 0xCA, 0x3F, 0x0F, 0x02, 0xC1, 0xAF, 0xBD, 0x03, 0x01, 0x13, 0x8A, 0x6B,
+    0x3A, 0x91, 0x11, 0x41, 0x4F, 0x67, 0xDC, 0xEA, 0x97, 0xF2, 0xCF, 0xCE, 0xF0, 0xB4, 0xE6, 0x73,
+    0x96, 0xAC, 0x74, 0x22, 0xE7, 0xAD, 0x35, 0x85, 0xE2, 0xF9, 0x37, 0xE8, 0x1C, 0x75, 0xDF, 0x6E,
+    0x47, 0xF1, 0x1A, 0x71, 0x1D, 0x29, 0xC5, 0x89, 0x6F, 0xB7, 0x62, 0x0E, 0xAA, 0x18, 0xBE, 0x1B,
+    0xFC, 0x56, 0x3E, 0x4B, 0xC6, 0xD2, 0x79, 0x20, 0x9A, 0xDB, 0xC0, 0xFE, 0x78, 0xCD, 0x5A, 0xF4,
+    0x1F, 0xDD, 0xA8, 0x33, 0x88, 0x07, 0xC7, 0x31, 0xB1, 0x12, 0x10, 0x59, 0x27, 0x80, 0xEC, 0x5F,
+    0x60, 0x51, 0x7F, 0xA9, 0x19, 0xB5, 0x4A, 0x0D, 0x2D, 0xE5, 0x7A, 0x9F, 0x93, 0xC9, 0x9C, 0xEF,
+    0xA0, 0xE0, 0x3B, 0x4D, 0xAE, 0x2A, 0xF5, 0xB0, 0xC8, 0xEB, 0xBB, 0x3C, 0x83, 0x53, 0x99, 0x61,
+    0x17, 0x2B, 0x04, 0x7E, 0xBA, 0x77, 0xD6, 0x26, 0xE1, 0x69, 0x14, 0x63, 0x55, 0x21, 0x0C, 0x7D
+]
+
+RCON = [
+    0x8d, 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80, 0x1b, 0x36, 0x6c, 0xd8, 0xab, 0x4d, 0x9a, 
+    0x2f, 0x5e, 0xbc, 0x63, 0xc6, 0x97, 0x35, 0x6a, 0xd4, 0xb3, 0x7d, 0xfa, 0xef, 0xc5, 0x91, 0x39, 
+    0x72, 0xe4, 0xd3, 0xbd, 0x61, 0xc2, 0x9f, 0x25, 0x4a, 0x94, 0x33, 0x66, 0xcc, 0x83, 0x1d, 0x3a, 
+    0x74, 0xe8, 0xcb, 0x8d, 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80, 0x1b, 0x36, 0x6c, 0xd8, 
+    0xab, 0x4d, 0x9a, 0x2f, 0x5e, 0xbc, 0x63, 0xc6, 0x97, 0x35, 0x6a, 0xd4, 0xb3, 0x7d, 0xfa, 0xef, 
+    0xc5, 0x91, 0x39, 0x72, 0xe4, 0xd3, 0xbd, 0x61, 0xc2, 0x9f, 0x25, 0x4a, 0x94, 0x33, 0x66, 0xcc, 
+    0x83, 0x1d, 0x3a, 0x74, 0xe8, 0xcb, 0x8d, 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80, 0x1b, 
+    0x36, 0x6c, 0xd8, 0xab, 0x4d, 0x9a, 0x2f, 0x5e, 0xbc, 0x63, 0xc6, 0x97, 0x35, 0x6a, 0xd4, 0xb3, 
+    0x7d, 0xfa, 0xef, 0xc5, 0x91, 0x39, 0x72, 0xe4, 0xd3, 0xbd, 0x61, 0xc2, 0x9f, 0x25, 0x4a, 0x94, 
+    0x33, 0x66, 0xcc, 0x83, 0x1d, 0x3a, 0x74, 0xe8, 0xcb, 0x8d, 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 
+    0x40, 0x80, 0x1b, 0x36, 0x6c, 0xd8, 0xab, 0x4d, 0x9a, 0x2f, 0x5e, 0xbc, 0x63, 0xc6, 0x97, 0x35, 
+    0x6a, 0xd4, 0xb3, 0x7d, 0xfa, 0xef, 0xc5, 0x91, 0x39, 0x72, 0xe4, 0xd3, 0xbd, 0x61, 0xc2, 0x9f, 
+    0x25, 0x4a, 0x94, 0x33, 0x66, 0xcc, 0x83, 0x1d, 0x3a, 0x74, 0xe8, 0xcb, 0x8d, 0x01, 0x02, 0x04, 
+    0x08, 0x10, 0x20, 0x40, 0x80, 0x1b, 0x36, 0x6c, 0xd8, 0xab, 0x4d, 0x9a, 0x2f, 0x5e, 0xbc, 0x63, 
+    0xc6, 0x97, 0x35, 0x6a, 0xd4, 0xb3, 0x7d, 0xfa, 0xef, 0xc5, 0x91, 0x39, 0x72, 0xe4, 0xd3, 0xbd, 
+    0x61, 0xc2, 0x9f, 0x25, 0x4a, 0x94, 0x33, 0x66, 0xcc, 0x83, 0x1d, 0x3a, 0x74, 0xe8, 0xcb, 0x8d
+]
+
+MUL2 = [
+    0x00,0x02,0x04,0x06,0x08,0x0a,0x0c,0x0e,0x10,0x12,0x14,0x16,0x18,0x1a,0x1c,0x1e,
+    0x20,0x22,0x24,0x26,0x28,0x2a,0x2c,0x2e,0x30,0x32,0x34,0x36,0x38,0x3a,0x3c,0x3e,
+    0x40,0x42,0x44,0x46,0x48,0x4a,0x4c,0x4e,0x50,0x52,0x54,0x56,0x58,0x5a,0x5c,0x5e,
+    0x60,0x62,0x64,0x66,0x68,0x6a,0x6c,0x6e,0x70,0x72,0x74,0x76,0x78,0x7a,0x7c,0x7e,
+    0x80,0x82,0x84,0x86,0x88,0x8a,0x8c,0x8e,0x90,0x92,0x94,0x96,0x98,0x9a,0x9c,0x9e,
+    0xa0,0xa2,0xa4,0xa6,0xa8,0xaa,0xac,0xae,0xb0,0xb2,0xb4,0xb6,0xb8,0xba,0xbc,0xbe,
+    0xc0,0xc2,0xc4,0xc6,0xc8,0xca,0xcc,0xce,0xd0,0xd2,0xd4,0xd6,0xd8,0xda,0xdc,0xde,
+    0xe0,0xe2,0xe4,0xe6,0xe8,0xea,0xec,0xee,0xf0,0xf2,0xf4,0xf6,0xf8,0xfa,0xfc,0xfe,
+    0x1b,0x19,0x1f,0x1d,0x13,0x11,0x17,0x15,0x0b,0x09,0x0f,0x0d,0x03,0x01,0x07,0x05,
+    0x3b,0x39,0x3f,0x3d,0x33,0x31,0x37,0x35,0x2b,0x29,0x2f,0x2d,0x23,0x21,0x27,0x25,
+    0x5b,0x59,0x5f,0x5d,0x53,0x51,0x57,0x55,0x4b,0x49,0x4f,0x4d,0x43,0x41,0x47,0x45,
+    0x7b,0x79,0x7f,0x7d,0x73,0x71,0x77,0x75,0x6b,0x69,0x6f,0x6d,0x63,0x61,0x67,0x65,
+    0x9b,0x99,0x9f,0x9d,0x93,0x91,0x97,0x95,0x8b,0x89,0x8f,0x8d,0x83,0x81,0x87,0x85,
+    0xbb,0xb9,0xbf,0xbd,0xb3,0xb1,0xb7,0xb5,0xab,0xa9,0xaf,0xad,0xa3,0xa1,0xa7,0xa5,
+    0xdb,0xd9,0xdf,0xdd,0xd3,0xd1,0xd7,0xd5,0xcb,0xc9,0xcf,0xcd,0xc3,0xc1,0xc7,0xc5,
+    0xfb,0xf9,0xff,0xfd,0xf3,0xf1,0xf7,0xf5,0xeb,0xe9,0xef,0xed,0xe3,0xe1,0xe7,0xe5
+]
+
+MUL3 = [
+    0x00,0x03,0x06,0x05,0x0c,0x0f,0x0a,0x09,0x18,0x1b,0x1e,0x1d,0x14,0x17,0x12,0x11,
+    0x30,0x33,0x36,0x35,0x3c,0x3f,0x3a,0x39,0x28,0x2b,0x2e,0x2d,0x24,0x27,0x22,0x21,
+    0x60,0x63,0x66,0x65,0x6c,0x6f,0x6a,0x69,0x78,0x7b,0x7e,0x7d,0x74,0x77,0x72,0x71,
+    0x50,0x53,0x56,0x55,0x5c,0x5f,0x5a,0x59,0x48,0x4b,0x4e,0x4d,0x44,0x47,0x42,0x41,
+    0xc0,0xc3,0xc6,0xc5,0xcc,0xcf,0xca,0xc9,0xd8,0xdb,0xde,0xdd,0xd4,0xd7,0xd2,0xd1,
+    0xf0,0xf3,0xf6,0xf5,0xfc,0xff,0xfa,0xf9,0xe8,0xeb,0xee,0xed,0xe4,0xe7,0xe2,0xe1,
+    0xa0,0xa3,0xa6,0xa5,0xac,0xaf,0xaa,0xa9,0xb8,0xbb,0xbe,0xbd,0xb4,0xb7,0xb2,0xb1,
+    0x90,0x93,0x96,0x95,0x9c,0x9f,0x9a,0x99,0x88,0x8b,0x8e,0x8d,0x84,0x87,0x82,0x81,
+    0x9b,0x98,0x9d,0x9e,0x97,0x94,0x91,0x92,0x83,0x80,0x85,0x86,0x8f,0x8c,0x89,0x8a,
+    0xab,0xa8,0xad,0xae,0xa7,0xa4,0xa1,0xa2,0xb3,0xb0,0xb5,0xb6,0xbf,0xbc,0xb9,0xba,
+    0xfb,0xf8,0xfd,0xfe,0xf7,0xf4,0xf1,0xf2,0xe3,0xe0,0xe5,0xe6,0xef,0xec,0xe9,0xea,
+    0xcb,0xc8,0xcd,0xce,0xc7,0xc4,0xc1,0xc2,0xd3,0xd0,0xd5,0xd6,0xdf,0xdc,0xd9,0xda,
+    0x5b,0x58,0x5d,0x5e,0x57,0x54,0x51,0x52,0x43,0x40,0x45,0x46,0x4f,0x4c,0x49,0x4a,
+    0x6b,0x68,0x6d,0x6e,0x67,0x64,0x61,0x62,0x73,0x70,0x75,0x76,0x7f,0x7c,0x79,0x7a,
+    0x3b,0x38,0x3d,0x3e,0x37,0x34,0x31,0x32,0x23,0x20,0x25,0x26,0x2f,0x2c,0x29,0x2a,
+    0x0b,0x08,0x0d,0x0e,0x07,0x04,0x01,0x02,0x13,0x10,0x15,0x16,0x1f,0x1c,0x19,0x1a
+]
+
+MUL9 = [
+    0x00,0x09,0x12,0x1b,0x24,0x2d,0x36,0x3f,0x48,0x41,0x5a,0x53,0x6c,0x65,0x7e,0x77,
+    0x90,0x99,0x82,0x8b,0xb4,0xbd,0xa6,0xaf,0xd8,0xd1,0xca,0xc3,0xfc,0xf5,0xee,0xe7,
+    0x3b,0x32,0x29,0x20,0x1f,0x16,0x0d,0x04,0x73,0x7a,0x61,0x68,0x57,0x5e,0x45,0x4c,
+    0xab,0xa2,0xb9,0xb0,0x8f,0x86,0x9d,0x94,0xe3,0xea,0xf1,0xf8,0xc7,0xce,0xd5,0xdc,
+    0x76,0x7f,0x64,0x6d,0x52,0x5b,0x40,0x49,0x3e,0x37,0x2c,0x25,0x1a,0x13,0x08,0x01,
+    0xe6,0xef,0xf4,0xfd,0xc2,0xcb,0xd0,0xd9,0xae,0xa7,0xbc,0xb5,0x8a,0x83,0x98,0x91,
+    0x4d,0x44,0x5f,0x56,0x69,0x60,0x7b,0x72,0x05,0x0c,0x17,0x1e,0x21,0x28,0x33,0x3a,
+    0xdd,0xd4,0xcf,0xc6,0xf9,0xf0,0xeb,0xe2,0x95,0x9c,0x87,0x8e,0xb1,0xb8,0xa3,0xaa,
+    0xec,0xe5,0xfe,0xf7,0xc8,0xc1,0xda,0xd3,0xa4,0xad,0xb6,0xbf,0x80,0x89,0x92,0x9b,
+    0x7c,0x75,0x6e,0x67,0x58,0x51,0x4a,0x43,0x34,0x3d,0x26,0x2f,0x10,0x19,0x02,0x0b,
+    0xd7,0xde,0xc5,0xcc,0xf3,0xfa,0xe1,0xe8,0x9f,0x96,0x8d,0x84,0xbb,0xb2,0xa9,0xa0,
+    0x47,0x4e,0x55,0x5c,0x63,0x6a,0x71,0x78,0x0f,0x06,0x1d,0x14,0x2b,0x22,0x39,0x30,
+    0x9a,0x93,0x88,0x81,0xbe,0xb7,0xac,0xa5,0xd2,0xdb,0xc0,0xc9,0xf6,0xff,0xe4,0xed,
+    0x0a,0x03,0x18,0x11,0x2e,0x27,0x3c,0x35,0x42,0x4b,0x50,0x59,0x66,0x6f,0x74,0x7d,
+    0xa1,0xa8,0xb3,0xba,0x85,0x8c,0x97,0x9e,0xe9,0xe0,0xfb,0xf2,0xcd,0xc4,0xdf,0xd6,
+    0x31,0x38,0x23,0x2a,0x15,0x1c,0x07,0x0e,0x79,0x70,0x6b,0x62,0x5d,0x54,0x4f,0x46
+]
+
+MUL11 = [
+    0x00,0x0b,0x16,0x1d,0x2c,0x27,0x3a,0x31,0x58,0x53,0x4e,0x45,0x74,0x7f,0x62,0x69,
+    0xb0,0xbb,0xa6,0xad,0x9c,0x97,0x8a,0x81,0xe8,0xe3,0xfe,0xf5,0xc4,0xcf,0xd2,0xd9,
+    0x7b,0x70,0x6d,0x66,0x57,0x5c,0x41,0x4a,0x23,0x28,0x35,0x3e,0x0f,0x04,0x19,0x12,
+    0xcb,0xc0,0xdd,0xd6,0xe7,0xec,0xf1,0xfa,0x93,0x98,0x85,0x8e,0xbf,0xb4,0xa9,0xa2,
+    0xf6,0xfd,0xe0,0xeb,0xda,0xd1,0xcc,0xc7,0xae,0xa5,0xb8,0xb3,0x82,0x89,0x94,0x9f,
+    0x46,0x4d,0x50,0x5b,0x6a,0x61,0x7c,0x77,0x1e,0x15,0x08,0x03,0x32,0x39,0x24,0x2f,
+    0x8d,0x86,0x9b,0x90,0xa1,0xaa,0xb7,0xbc,0xd5,0xde,0xc3,0xc8,0xf9,0xf2,0xef,0xe4,
+    0x3d,0x36,0x2b,0x20,0x11,0x1a,0x07,0x0c,0x65,0x6e,0x73,0x78,0x49,0x42,0x5f,0x54,
+    0xf7,0xfc,0xe1,0xea,0xdb,0xd0,0xcd,0xc6,0xaf,0xa4,0xb9,0xb2,0x83,0x88,0x95,0x9e,
+    0x47,0x4c,0x51,0x5a,0x6b,0x60,0x7d,0x76,0x1f,0x14,0x09,0x02,0x33,0x38,0x25,0x2e,
+    0x8c,0x87,0x9a,0x91,0xa0,0xab,0xb6,0xbd,0xd4,0xdf,0xc2,0xc9,0xf8,0xf3,0xee,0xe5,
+    0x3c,0x37,0x2a,0x21,0x10,0x1b,0x06,0x0d,0x64,0x6f,0x72,0x79,0x48,0x43,0x5e,0x55,
+    0x01,0x0a,0x17,0x1c,0x2d,0x26,0x3b,0x30,0x59,0x52,0x4f,0x44,0x75,0x7e,0x63,0x68,
+    0xb1,0xba,0xa7,0xac,0x9d,0x96,0x8b,0x80,0xe9,0xe2,0xff,0xf4,0xc5,0xce,0xd3,0xd8,
+    0x7a,0x71,0x6c,0x67,0x56,0x5d,0x40,0x4b,0x22,0x29,0x34,0x3f,0x0e,0x05,0x18,0x13,
+    0xca,0xc1,0xdc,0xd7,0xe6,0xed,0xf0,0xfb,0x92,0x99,0x84,0x8f,0xbe,0xb5,0xa8,0xa3
+]
+
+MUL13 = [
+    0x00,0x0d,0x1a,0x17,0x34,0x39,0x2e,0x23,0x68,0x65,0x72,0x7f,0x5c,0x51,0x46,0x4b,
+    0xd0,0xdd,0xca,0xc7,0xe4,0xe9,0xfe,0xf3,0xb8,0xb5,0xa2,0xaf,0x8c,0x81,0x96,0x9b,
+    0xbb,0xb6,0xa1,0xac,0x8f,0x82,0x95,0x98,0xd3,0xde,0xc9,0xc4,0xe7,0xea,0xfd,0xf0,
+    0x6b,0x66,0x71,0x7c,0x5f,0x52,0x45,0x48,0x03,0x0e,0x19,0x14,0x37,0x3a,0x2d,0x20,
+    0x6d,0x60,0x77,0x7a,0x59,0x54,0x43,0x4e,0x05,0x08,0x1f,0x12,0x31,0x3c,0x2b,0x26,
+    0xbd,0xb0,0xa7,0xaa,0x89,0x84,0x93,0x9e,0xd5,0xd8,0xcf,0xc2,0xe1,0xec,0xfb,0xf6,
+    0xd6,0xdb,0xcc,0xc1,0xe2,0xef,0xf8,0xf5,0xbe,0xb3,0xa4,0xa9,0x8a,0x87,0x90,0x9d,
+    0x06,0x0b,0x1c,0x11,0x32,0x3f,0x28,0x25,0x6e,0x63,0x74,0x79,0x5a,0x57,0x40,0x4d,
+    0xda,0xd7,0xc0,0xcd,0xee,0xe3,0xf4,0xf9,0xb2,0xbf,0xa8,0xa5,0x86,0x8b,0x9c,0x91,
+    0x0a,0x07,0x10,0x1d,0x3e,0x33,0x24,0x29,0x62,0x6f,0x78,0x75,0x56,0x5b,0x4c,0x41,
+    0x61,0x6c,0x7b,0x76,0x55,0x58,0x4f,0x42,0x09,0x04,0x13,0x1e,0x3d,0x30,0x27,0x2a,
+    0xb1,0xbc,0xab,0xa6,0x85,0x88,0x9f,0x92,0xd9,0xd4,0xc3,0xce,0xed,0xe0,0xf7,0xfa,
+    0xb7,0xba,0xad,0xa0,0x83,0x8e,0x99,0x94,0xdf,0xd2,0xc5,0xc8,0xeb,0xe6,0xf1,0xfc,
+    0x67,0x6a,0x7d,0x70,0x53,0x5e,0x49,0x44,0x0f,0x02,0x15,0x18,0x3b,0x36,0x21,0x2c,
+    0x0c,0x01,0x16,0x1b,0x38,0x35,0x22,0x2f,0x64,0x69,0x7e,0x73,0x50,0x5d,0x4a,0x47,
+    0xdc,0xd1,0xc6,0xcb,0xe8,0xe5,0xf2,0xff,0xb4,0xb9,0xae,0xa3,0x80,0x8d,0x9a,0x97
+]
+
+MUL14 = [
+    0x00,0x0e,0x1c,0x12,0x38,0x36,0x24,0x2a,0x70,0x7e,0x6c,0x62,0x48,0x46,0x54,0x5a,
+    0xe0,0xee,0xfc,0xf2,0xd8,0xd6,0xc4,0xca,0x90,0x9e,0x8c,0x82,0xa8,0xa6,0xb4,0xba,
+    0xdb,0xd5,0xc7,0xc9,0xe3,0xed,0xff,0xf1,0xab,0xa5,0xb7,0xb9,0x93,0x9d,0x8f,0x81,
+    0x3b,0x35,0x27,0x29,0x03,0x0d,0x1f,0x11,0x4b,0x45,0x57,0x59,0x73,0x7d,0x6f,0x61,
+    0xad,0xa3,0xb1,0xbf,0x95,0x9b,0x89,0x87,0xdd,0xd3,0xc1,0xcf,0xe5,0xeb,0xf9,0xf7,
+    0x4d,0x43,0x51,0x5f,0x75,0x7b,0x69,0x67,0x3d,0x33,0x21,0x2f,0x05,0x0b,0x19,0x17,
+    0x76,0x78,0x6a,0x64,0x4e,0x40,0x52,0x5c,0x06,0x08,0x1a,0x14,0x3e,0x30,0x22,0x2c,
+    0x96,0x98,0x8a,0x84,0xae,0xa0,0xb2,0xbc,0xe6,0xe8,0xfa,0xf4,0xde,0xd0,0xc2,0xcc,
+    0x41,0x4f,0x5d,0x53,0x79,0x77,0x65,0x6b,0x31,0x3f,0x2d,0x23,0x09,0x07,0x15,0x1b,
+    0xa1,0xaf,0xbd,0xb3,0x99,0x97,0x85,0x8b,0xd1,0xdf,0xcd,0xc3,0xe9,0xe7,0xf5,0xfb,
+    0x9a,0x94,0x86,0x88,0xa2,0xac,0xbe,0xb0,0xea,0xe4,0xf6,0xf8,0xd2,0xdc,0xce,0xc0,
+    0x7a,0x74,0x66,0x68,0x42,0x4c,0x5e,0x50,0x0a,0x04,0x16,0x18,0x32,0x3c,0x2e,0x20,
+    0xec,0xe2,0xf0,0xfe,0xd4,0xda,0xc8,0xc6,0x9c,0x92,0x80,0x8e,0xa4,0xaa,0xb8,0xb6,
+    0x0c,0x02,0x10,0x1e,0x34,0x3a,0x28,0x26,0x7c,0x72,0x60,0x6e,0x44,0x4a,0x58,0x56,
+    0x37,0x39,0x2b,0x25,0x0f,0x01,0x13,0x1d,0x47,0x49,0x5b,0x55,0x7f,0x71,0x63,0x6d,
+    0xd7,0xd9,0xcb,0xc5,0xef,0xe1,0xf3,0xfd,0xa7,0xa9,0xbb,0xb5,0x9f,0x91,0x83,0x8d
+]
+
+AES_ROUNDS = {128: 10, 192: 12, 256: 14}
+
+def rotateWord(word, bits):
+    return (word >> bits | word << (32 - bits)) & 0xffffffff
+
+# T-tables: SubBytes and MixColumns (or their inverses) folded into one 32-bit
+# lookup per byte, the other three tables being byte rotations of the first
+TE0 = [MUL2[s] << 24 | s << 16 | s << 8 | MUL3[s] for s in SBOX]
+TE1 = [rotateWord(word, 8) for word in TE0]
+TE2 = [rotateWord(word, 16) for word in TE0]
+TE3 = [rotateWord(word, 24) for word in TE0]
+
+TD0 = [MUL14[s] << 24 | MUL9[s] << 16 | MUL13[s] << 8 | MUL11[s] for s in SBOX_INV]
+TD1 = [rotateWord(word, 8) for word in TD0]
+TD2 = [rotateWord(word, 16) for word in TD0]
+TD3 = [rotateWord(word, 24) for word in TD0]
+
+def subWord(word):
+    return SBOX[word >> 24] << 24 | SBOX[word >> 16 & 255] << 16 | SBOX[word >> 8 & 255] << 8 | SBOX[word & 255]
+
+def keyExpansion(key):
+    # FIPS-197 key expansion of a 16, 24 or 32-byte key into 4 * (rounds + 1)
+    # 32-bit words
+    if len(key) * 8 not in AES_ROUNDS:
+        raise ValueError('Key must have 128, 192 or 256 bits (has {})'.format(len(key) * 8))
+
+    nk = len(key) // 4
+    rounds = AES_ROUNDS[len(key) * 8]
+    words = list(struct.unpack('>{}I'.format(nk), key))
+
+    for i in range(nk, 4 * (rounds + 1)):
+        temp = words[i - 1]
+
+        if i % nk == 0:
+            temp = subWord(rotateWord(temp, 24)) ^ RCON[i // nk] << 24
+        elif nk > 6 and i % nk == 4:
+            temp = subWord(temp)
+
+        words.append(words[i - nk] ^ temp)
+
+    return words
+
+def decryptionKeys(roundKeys, rounds):
+    # round keys for the equivalent inverse cipher: reversed, with
+    # InvMixColumns applied to every round key but the first and the last
+    decKeys = roundKeys[4 * rounds:4 * rounds + 4]
+
+    for round in range(rounds - 1, 0, -1):
+        for word in roundKeys[4 * round:4 * round + 4]:
+            decKeys.append(
+                TD0[SBOX[word >> 24]] ^ TD1[SBOX[word >> 16 & 255]] ^
+                TD2[SBOX[word >> 8 & 255]] ^ TD3[SBOX[word & 255]]
+            )
+
+    return decKeys + roundKeys[:4]
+
+def encryptBlocks(data, roundKeys, rounds, IV=None, out=None):
+    # AES over whole 16-byte blocks, chained as CBC when an IV is given, into
+    # out if given
+    te0, te1, te2, te3, sbox = TE0, TE1, TE2, TE3, SBOX
+    result = bytearray(len(data)) if out is None else out
+    position = 0
+
+    if IV is not None:
+        c0, c1, c2, c3 = struct.unpack('>4I', IV)
+
+    for s0, s1, s2, s3 in struct.iter_unpack('>4I', data):
+        if IV is not None:
+            s0 ^= c0
+            s1 ^= c1
+            s2 ^= c2
+            s3 ^= c3
+
+        s0 ^= roundKeys[0]
+        s1 ^= roundKeys[1]
+        s2 ^= roundKeys[2]
+        s3 ^= roundKeys[3]
+        for k in range(4, 4 * rounds, 4):
+            t0 = te0[s0 >> 24] ^ te1[s1 >> 16 & 255] ^ te2[s2 >> 8 & 255] ^ te3[s3 & 255] ^ roundKeys[k]
+            t1 = te0[s1 >> 24] ^ te1[s2 >> 16 & 255] ^ te2[s3 >> 8 & 255] ^ te3[s0 & 255] ^ roundKeys[k + 1]
+            t2 = te0[s2 >> 24] ^ te1[s3 >> 16 & 255] ^ te2[s0 >> 8 & 255] ^ te3[s1 & 255] ^ roundKeys[k + 2]
+            t3 = te0[s3 >> 24] ^ te1[s0 >> 16 & 255] ^ te2[s1 >> 8 & 255] ^ te3[s2 & 255] ^ roundKeys[k + 3]
+            s0, s1, s2, s3 = t0, t1, t2, t3
+
+        k = 4 * rounds
+
+        c0 = (sbox[s0 >> 24] << 24 | sbox[s1 >> 16 & 255] << 16 | sbox[s2 >> 8 & 255] << 8 | sbox[s3 & 255]) ^ roundKeys[k]
+        c1 = (sbox[s1 >> 24] << 24 | sbox[s2 >> 16 & 255] << 16 | sbox[s3 >> 8 & 255] << 8 | sbox[s0 & 255]) ^ roundKeys[k + 1]
+        c2 = (sbox[s2 >> 24] << 24 | sbox[s3 >> 16 & 255] << 16 | sbox[s0 >> 8 & 255] << 8 | sbox[s1 & 255]) ^ roundKeys[k + 2]
+        c3 = (sbox[s3 >> 24] << 24 | sbox[s0 >> 16 & 255] << 16 | sbox[s1 >> 8 & 255] << 8 | sbox[s2 & 255]) ^ roundKeys[k + 3]
+
+        struct.pack_into('>4I', result, position, c0, c1, c2, c3)
+        position += 16
+
+    return bytes(result) if out is None else out
+
+def decryptBlocks(data, decKeys, rounds):
+    # inverse of encryptBlocks without chaining, decKeys coming from decryptionKeys
+    td0, td1, td2, td3, sbox = TD0, TD1, TD2, TD3, SBOX_INV
+    out = bytearray(len(data))
+    position = 0
+
+    for s0, s1, s2, s3 in struct.iter_unpack('>4I', data):
+        s0 ^= decKeys[0]
+        s1 ^= decKeys[1]
+        s2 ^= decKeys[2]
+        s3 ^= decKeys[3]
+        for k in range(4, 4 * rounds, 4):
+            t0 = td0[s0 >> 24] ^ td1[s3 >> 16 & 255] ^ td2[s2 >> 8 & 255] ^ td3[s1 & 255] ^ decKeys[k]
+            t1 = td0[s1 >> 24] ^ td1[s0 >> 16 & 255] ^ td2[s3 >> 8 & 255] ^ td3[s2 & 255] ^ decKeys[k + 1]
+            t2 = td0[s2 >> 24] ^ td1[s1 >> 16 & 255] ^ td2[s0 >> 8 & 255] ^ td3[s3 & 255] ^ decKeys[k + 2]
+            t3 = td0[s3 >> 24] ^ td1[s2 >> 16 & 255] ^ td2[s1 >> 8 & 255] ^ td3[s0 & 255] ^ decKeys[k + 3]
+            s0, s1, s2, s3 = t0, t1, t2, t3
+
+        k = 4 * rounds
+
+        p0 = (sbox[s0 >> 24] << 24 | sbox[s3 >> 16 & 255] << 16 | sbox[s2 >> 8 & 255] << 8 | sbox[s1 & 255]) ^ decKeys[k]
+        p1 = (sbox[s1 >> 24] << 24 | sbox[s0 >> 16 & 255] << 16 | sbox[s3 >> 8 & 255] << 8 | sbox[s2 & 255]) ^ decKeys[k + 1]
+        p2 = (sbox[s2 >> 24] << 24 | sbox[s1 >> 16 & 255] << 16 | sbox[s0 >> 8 & 255] << 8 | sbox[s3 & 255]) ^ decKeys[k + 2]
+        p3 = (sbox[s3 >> 24] << 24 | sbox[s2 >> 16 & 255] << 16 | sbox[s1 >> 8 & 255] << 8 | sbox[s0 & 255]) ^ decKeys[k + 3]
+
+        struct.pack_into('>4I', out, position, p0, p1, p2, p3)
+        position += 16
+
+    return bytes(out)
+
+#-----------------------------------
+#            BITSLICING
+#-----------------------------------
+
+# translate tables turning a byte into '0'/'1' for one of its bits (MSB first),
+# and '0'/'1' back into 0/1 bytes
+BIT_CHARS = [bytes(b'01'[byte >> (7 - bit) & 1] for byte in range(256)) for bit in range(8)]
+CHAR_BITS = bytes.maketrans(b'01', b'\x00\x01')
+
+def bitslicePack(data):
+    # 16-byte blocks into 128 wires, wire 8 * i + bit holding that bit of
+    # byte i of every block, block 0 in the most significant position
+    wires = []
+
+    for i in range(16):
+        column = data[i::16]
+        for bit in range(8):
+            wires.append(int(column.translate(BIT_CHARS[bit]), 2))
+
+    return wires
+
+def bitsliceUnpack(wires, n):
+    out = bytearray(16 * n)
+    spread = '0{}b'.format(n)
+
+    for i in range(16):
+        column = 0
+        for bit in range(8):
+            # every bit of the wire widened to a byte holding 0 or 1
+            bits = format(wires[8 * i + bit], spread).encode().translate(CHAR_BITS)
+            column |= int.from_bytes(bits, 'big') << (7 - bit)
+        out[i::16] = column.to_bytes(n, 'big')
+
+    return out
+
+def bitsliceSbox(U, mask):
+    # Boyar-Peralta S-box circuit (113 gates) over 8 wires, U0 being the most
+    # significant bit; XNORs are XORs with the all-ones mask
+    U0, U1, U2, U3, U4, U5, U6, U7 = U
+    T1 = U0 ^ U3
+    T2 = U0 ^ U5
+    T3 = U0 ^ U6
+    T4 = U3 ^ U5
+    T5 = U4 ^ U6
+    T6 = T1 ^ T5
+    T7 = U1 ^ U2
+    T8 = U7 ^ T6
+    T9 = U7 ^ T7
+    T10 = T6 ^ T7
+    T11 = U1 ^ U5
+    T12 = U2 ^ U5
+    T13 = T3 ^ T4
+    T14 = T6 ^ T11
+    T15 = T5 ^ T11
+    T16 = T5 ^ T12
+    T17 = T9 ^ T16
+    T18 = U3 ^ U7
+    T19 = T7 ^ T18
+    T20 = T1 ^ T19
+    T21 = U6 ^ U7
+    T22 = T7 ^ T21
+    T23 = T2 ^ T22
+    T24 = T2 ^ T10
+    T25 = T20 ^ T17
+    T26 = T3 ^ T16
+    T27 = T1 ^ T12
+    D = U7
+    M1 = T13 & T6
+    M2 = T23 & T8
+    M3 = T14 ^ M1
+    M4 = T19 & D
+    M5 = M4 ^ M1
+    M6 = T3 & T16
+    M7 = T22 & T9
+    M8 = T26 ^ M6
+    M9 = T20 & T17
+    M10 = M9 ^ M6
+    M11 = T1 & T15
+    M12 = T4 & T27
+    M13 = M12 ^ M11
+    M14 = T2 & T10
+    M15 = M14 ^ M11
+    M16 = M3 ^ M2
+    M17 = M5 ^ T24
+    M18 = M8 ^ M7
+    M19 = M10 ^ M15
+    M20 = M16 ^ M13
+    M21 = M17 ^ M15
+    M22 = M18 ^ M13
+    M23 = M19 ^ T25
+    M24 = M22 ^ M23
+    M25 = M22 & M20
+    M26 = M21 ^ M25
+    M27 = M20 ^ M21
+    M28 = M23 ^ M25
+    M29 = M28 & M27
+    M30 = M26 & M24
+    M31 = M20 & M23
+    M32 = M27 & M31
+    M33 = M27 ^ M25
+    M34 = M21 & M22
+    M35 = M24 & M34
+    M36 = M24 ^ M25
+    M37 = M21 ^ M29
+    M38 = M32 ^ M33
+    M39 = M23 ^ M30
+    M40 = M35 ^ M36
+    M41 = M38 ^ M40
+    M42 = M37 ^ M39
+    M43 = M37 ^ M38
+    M44 = M39 ^ M40
+    M45 = M42 ^ M41
+    M46 = M44 & T6
+    M47 = M40 & T8
+    M48 = M39 & D
+    M49 = M43 & T16
+    M50 = M38 & T9
+    M51 = M37 & T17
+    M52 = M42 & T15
+    M53 = M45 & T27
+    M54 = M41 & T10
+    M55 = M44 & T13
+    M56 = M40 & T23
+    M57 = M39 & T19
+    M58 = M43 & T3
+    M59 = M38 & T22
+    M60 = M37 & T20
+    M61 = M42 & T1
+    M62 = M45 & T4
+    M63 = M41 & T2
+    L0 = M61 ^ M62
+    L1 = M50 ^ M56
+    L2 = M46 ^ M48
+    L3 = M47 ^ M55
+    L4 = M54 ^ M58
+    L5 = M49 ^ M61
+    L6 = M62 ^ L5
+    L7 = M46 ^ L3
+    L8 = M51 ^ M59
+    L9 = M52 ^ M53
+    L10 = M53 ^ L4
+    L11 = M60 ^ L2
+    L12 = M48 ^ M51
+    L13 = M50 ^ L0
+    L14 = M52 ^ M61
+    L15 = M55 ^ L1
+    L16 = M56 ^ L0
+    L17 = M57 ^ L1
+    L18 = M58 ^ L8
+    L19 = M63 ^ L4
+    L20 = L0 ^ L1
+    L21 = L1 ^ L7
+    L22 = L3 ^ L12
+    L23 = L18 ^ L2
+    L24 = L15 ^ L9
+    L25 = L6 ^ L10
+    L26 = L7 ^ L9
+    L27 = L8 ^ L10
+    L28 = L11 ^ L14
+    L29 = L11 ^ L17
+    S0 = L6 ^ L24
+    S1 = L16 ^ L26 ^ mask
+    S2 = L19 ^ L28 ^ mask
+    S3 = L6 ^ L21
+    S4 = L20 ^ L22
+    S5 = L25 ^ L29
+    S6 = L13 ^ L27 ^ mask
+    S7 = L6 ^ L23 ^ mask
+    return [S0, S1, S2, S3, S4, S5, S6, S7]
+
+def xtimeWires(a):
+    # multiplication by x in GF(2^8) on one byte's wires
+    return [a[1], a[2], a[3], a[4] ^ a[0], a[5] ^ a[0], a[6], a[7] ^ a[0], a[0]]
+
+# byte each position takes its wires from in ShiftRows, column-major
+SHIFT_ROWS = [4 * ((i // 4 + i % 4) % 4) + i % 4 for i in range(16)]
+
+def bitslicedEncrypt(data, roundKeys, rounds, batchSize=BITSLICE_BATCH, out=None):
+    # encryptBlocks for many independent blocks at once, each pass running
+    # the cipher as boolean logic over batchSize blocks
+    keyBytes = struct.pack('>{}I'.format(len(roundKeys)), *roundKeys)
+    keyWires = [
+        [w for w in range(128) if keyBytes[16 * round + w // 8] >> (7 - w % 8) & 1]
+        for round in range(rounds + 1)
+    ]
+    result = bytearray(len(data)) if out is None else out
+
+    for start in range(0, len(data), 16 * batchSize):
+        chunk = bytes(data[start:start + 16 * batchSize])
+        n = len(chunk) // 16
+        mask = (1 << n) - 1
+        wires = bitslicePack(chunk)
+
+        for round in range(rounds + 1):
+            if round:
+                state = []
+                for i in SHIFT_ROWS:
+                    state.append(bitsliceSbox(wires[8 * i:8 * i + 8], mask))
+
+                wires = []
+                for c in range(0, 16, 4):
+                    a0, a1, a2, a3 = state[c:c + 4]
+
+                    if round == rounds:
+                        wires += a0 + a1 + a2 + a3
+                        continue
+
+                    t = [x0 ^ x1 ^ x2 ^ x3 for x0, x1, x2, x3 in zip(a0, a1, a2, a3)]
+                    for x, y in ((a0, a1), (a1, a2), (a2, a3), (a3, a0)):
+                        xt = xtimeWires([p ^ q for p, q in zip(x, y)])
+                        wires += [p ^ q ^ r for p, q, r in zip(x, t, xt)]
+
+            for w in keyWires[round]:
+                wires[w] ^= mask
+
+        result[start:start + 16 * n] = bitsliceUnpack(wires, n)
+
+    return bytes(result) if out is None else out
+
+#-----------------------------------
+#           NUMPY ENGINE
+#-----------------------------------
+
+if numpy is not None:
+    SBOX_ARRAY = numpy.array(SBOX, numpy.uint8)
+    SBOX_INV_ARRAY = numpy.array(SBOX_INV, numpy.uint8)
+    MUL2_ARRAY, MUL9_ARRAY, MUL11_ARRAY, MUL13_ARRAY, MUL14_ARRAY = (
+        numpy.array(table, numpy.uint8) for table in (MUL2, MUL9, MUL11, MUL13, MUL14)
+    )
+
+# byte each position takes in InvShiftRows, column-major
+SHIFT_ROWS_INV = [4 * ((i // 4 - i % 4) % 4) + i % 4 for i in range(16)]
+
+def roundKeyArray(roundKeys, rounds):
+    keyBytes = struct.pack('>{}I'.format(len(roundKeys)), *roundKeys)
+    return numpy.frombuffer(keyBytes, numpy.uint8).reshape(rounds + 1, 16)
+
+def numpyEncryptBlocks(data, roundKeys, rounds, out=None):
+    # encryptBlocks without chaining over an (N, 16) array, every round step
+    # applied to all N blocks at once, into out if given
+    keys = roundKeyArray(roundKeys, rounds)
+    state = numpy.frombuffer(data, numpy.uint8).reshape(-1, 16) ^ keys[0]
+
+    for round in range(1, rounds + 1):
+        state = SBOX_ARRAY[state[:, SHIFT_ROWS]]
+
+        if round < rounds:
+            a0, a1, a2, a3 = state[:, 0::4], state[:, 1::4], state[:, 2::4], state[:, 3::4]
+            t = a0 ^ a1 ^ a2 ^ a3
+            mixed = numpy.empty_like(state)
+            mixed[:, 0::4] = a0 ^ t ^ MUL2_ARRAY[a0 ^ a1]
+            mixed[:, 1::4] = a1 ^ t ^ MUL2_ARRAY[a1 ^ a2]
+            mixed[:, 2::4] = a2 ^ t ^ MUL2_ARRAY[a2 ^ a3]
+            mixed[:, 3::4] = a3 ^ t ^ MUL2_ARRAY[a3 ^ a0]
+            state = mixed
+
+        state ^= keys[round]
+
+    if out is None:
+        return state.tobytes()
+
+    numpy.frombuffer(out, numpy.uint8).reshape(-1, 16)[:] = state
+    return out
+
+def numpyDecryptBlocks(data, decKeys, rounds):
+    # decryptBlocks over an (N, 16) array, following the same equivalent
+    # inverse cipher
+    keys = roundKeyArray(decKeys, rounds)
+    state = numpy.frombuffer(data, numpy.uint8).reshape(-1, 16) ^ keys[0]
+
+    for round in range(1, rounds + 1):
+        state = SBOX_INV_ARRAY[state[:, SHIFT_ROWS_INV]]
+
+        if round < rounds:
+            a0, a1, a2, a3 = state[:, 0::4], state[:, 1::4], state[:, 2::4], state[:, 3::4]
+            mixed = numpy.empty_like(state)
+            mixed[:, 0::4] = MUL14_ARRAY[a0] ^ MUL11_ARRAY[a1] ^ MUL13_ARRAY[a2] ^ MUL9_ARRAY[a3]
+            mixed[:, 1::4] = MUL9_ARRAY[a0] ^ MUL14_ARRAY[a1] ^ MUL11_ARRAY[a2] ^ MUL13_ARRAY[a3]
+            mixed[:, 2::4] = MUL13_ARRAY[a0] ^ MUL9_ARRAY[a1] ^ MUL14_ARRAY[a2] ^ MUL11_ARRAY[a3]
+            mixed[:, 3::4] = MUL11_ARRAY[a0] ^ MUL13_ARRAY[a1] ^ MUL9_ARRAY[a2] ^ MUL14_ARRAY[a3]
+            state = mixed
+
+        state ^= keys[round]
+
+    return state.tobytes()
+
+def aesEncrypt(data, roundKeys, rounds, out=None):
+    # unchained encryption of whole blocks on the fastest engine for their
+    # size, into out if given
+    if numpy is not None and len(data) >= AES_NUMPY_THRESHOLD:
+        return numpyEncryptBlocks(data, roundKeys, rounds, out)
+
+    if len(data) >= BITSLICE_THRESHOLD:
+        return bitslicedEncrypt(data, roundKeys, rounds, out=out)
+
+    return encryptBlocks(data, roundKeys, rounds, out=out)
+
+def aesDecrypt(data, decKeys, rounds):
+    if numpy is not None and len(data) >= AES_NUMPY_THRESHOLD:
+        return numpyDecryptBlocks(data, decKeys, rounds)
+
+    return decryptBlocks(data, decKeys, rounds)
+
+def decryptCBC(data, decKeys, rounds, IV):
+    # CBC decryption in one pass: the blocks are deciphered independently,
+    # then XORed as a whole against the ciphertext shifted one block right
+    # behind the IV, into a single preallocated buffer
+    data = bytes(data)
+    out = bytearray(len(data))
+    xorBytes(aesDecrypt(data, decKeys, rounds), IV + data[:-16], out)
+    return out
+
+def intToBytes(n, size=None, byteorder='big'):
+    # size is in bytes and defaults to the fewest that hold n
+    if size is None:
+        size = (n.bit_length() + 7) // 8
+
+    try:
+        return n.to_bytes(size, byteorder)
+    except OverflowError:
+        raise ValueError('{} does not fit in {} bytes'.format(n, size))
+
+def bytesToInt(data, byteorder='big'):
+    return int.from_bytes(data, byteorder)
+
+def popCount(n):
+    # set bits of a non-negative int, with int.bit_count where it exists
+    return bin(n).count('1')
+
+if hasattr(int, 'bit_count'):
+    popCount = int.bit_count
+
+def bytesToBits(buffer, size):
+    if not size:
+        return ''
+
+    bits = format(int.from_bytes(buffer, 'big'), '0{}b'.format(len(buffer) * 8))
+    return bits[:size]
+
+def bitsToBytes(bits):
+    if not len(bits):
+        return b''
+
+    padBits = -len(bits) % 8
+    return (int(bits, 2) << padBits).to_bytes((len(bits) + padBits) // 8, 'big')
+
+def xorBytes(data, key, out=None):
+    # XORs data with key repeated over its whole length (the key does not need
+    # to divide it) and stores the result in out if given, which may be data
+    # itself for an in-place XOR
+    size = len(data)
+    data = memoryview(data)
+
+    if len(key) >= size:
+        # a key covering the data (a keystream) is read in place
+        key = memoryview(key)[:size]
+
+        if numpy is not None and size >= XOR_NUMPY_THRESHOLD:
+            if out is None:
+                out = bytearray(size)
+            numpy.bitwise_xor(numpy.frombuffer(data, numpy.uint8), numpy.frombuffer(key, numpy.uint8), out=numpy.frombuffer(out, numpy.uint8))
+            return out
+
+        result = (int.from_bytes(data, 'big') ^ int.from_bytes(key, 'big')).to_bytes(size, 'big')
+        if out is None:
+            return result
 
-class Binary:
-    def __init__(self, data='', base=2, pad=None):
-        self.decToHex = ['0','1','2','3','4','5','6','7','8','9','a','b','c','d','e','f']
-        self.decToBin = [
-            '0000', '0001', '0010', '0011',
-            '0100', '0101', '0110', '0111',
-            '1000', '1001', '1010', '1011',
-            '1100', '1101', '1110', '1111',
-        ]
+        out[:size] = result
+        return out
+
+    key = bytes(key)
+    chunk = len(key) * max(XOR_CHUNK // len(key), 1)
+
+    if out is None and size <= chunk:
+        tiled = key * (size // len(key)) + key[:size % len(key)]
+        return (int.from_bytes(data, 'big') ^ int.from_bytes(tiled, 'big')).to_bytes(size, 'big')
+
+    if out is None:
+        out = bytearray(size)
+
+    if numpy is not None and size >= XOR_NUMPY_THRESHOLD:
+        source = numpy.frombuffer(data, numpy.uint8)
+        result = numpy.frombuffer(out, numpy.uint8)
+        tiled = numpy.tile(numpy.frombuffer(key, numpy.uint8), chunk // len(key))
+
+        for start in range(0, size, chunk):
+            stop = min(start + chunk, size)
+            numpy.bitwise_xor(source[start:stop], tiled[:stop - start], out=result[start:stop])
+
+        return out
+
+    tiled = key * (chunk // len(key))
+    tiledInt = int.from_bytes(tiled, 'big')
+
+    for start in range(0, size, chunk):
+        stop = min(start + chunk, size)
+        keyInt = tiledInt if stop - start == chunk else int.from_bytes(tiled[:stop - start], 'big')
+        out[start:stop] = (int.from_bytes(data[start:stop], 'big') ^ keyInt).to_bytes(stop - start, 'big')
+
+    return out
+
+class RandomPool:
+    # hands out random bytes from a buffer refilled in large chunks, from
+    # os.urandom or, once seeded, from a reproducible generator. An unseeded
+    # pool drops its buffer in forked children so processes never share bytes
+
+    def __init__(self, seed=None, chunkSize=RANDOM_CHUNK):
+        self.chunkSize = chunkSize
+        self.lock = threading.Lock()
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        with self.lock:
+            self.generator = None if seed is None else random.Random(seed)
+            self.pool = b''
+            self.position = 0
+            self.pid = os.getpid()
+
+    def refill(self, size):
+        size = max(size, self.chunkSize)
+
+        if self.generator is None:
+            return os.urandom(size)
+
+        return intToBytes(self.generator.getrandbits(size * 8), size)
+
+    def read(self, size):
+        with self.lock:
+            if self.pid != os.getpid() and self.generator is None:
+                self.pool = b''
+                self.position = 0
+                self.pid = os.getpid()
 
+            if self.position + size > len(self.pool):
+                remaining = self.pool[self.position:]
+                self.pool = remaining + self.refill(size - len(remaining))
+                self.position = 0
+
+            data = self.pool[self.position:self.position + size]
+            self.position += size
+
+        return data
+
+randomPool = RandomPool()
+
+class Binary:
+    # bits are kept left-aligned in self.buffer, self.size being the number of
+    # meaningful bits (the unused low bits of the last byte are always zero).
+    # Values built from hex, base64 or ASCII keep that text in self.source and
+    # are only decoded once the buffer is needed, and every encoding computed
+    # by the to* methods is remembered in self.encoded
+    __slots__ = ('_buffer', '_size', 'source', 'encoded')
+
+    def __init__(self, data='', base=2, pad=None, byteorder='big'):
         if base == 2:
-            self.binary = data
+            self.fromBin(data)
         elif base == 10:
-            self.fromDec(data, pad)
+            self.fromDec(data, pad, byteorder)
         elif base == 16:
             self.fromHex(data)
         elif base == 64:
             self.fromBase64(data)
         elif base == 128:
             self.fromAscii(data)
+        elif base == 256:
+            self.fromBytes(data)
+
+    @property
+    def buffer(self):
+        if self._buffer is None:
+            self.decode()
+        return self._buffer
+
+    @property
+    def size(self):
+        if self._size is None:
+            self.decode()
+        return self._size
+
+    @property
+    def binary(self):
+        return bytesToBits(self.buffer, self.size)
+
+    def load(self, buffer, size):
+        self._buffer = buffer
+        self._size = size
+        self.source = None
+        self.encoded = None
+
+    def defer(self, data, base, size=None):
+        self._buffer = None
+        self._size = size
+        self.source = (data, base)
+        self.encoded = None
+
+    def decode(self):
+        data, base = self.source
+
+        if base == 16 and len(data) % 2:
+            self._buffer = binascii.unhexlify(data + '0')
+        elif base == 16:
+            self._buffer = binascii.unhexlify(data)
+        elif base == 64:
+            self._buffer = base64.b64decode(data)
+        elif base == 128:
+            self._buffer = data.encode('latin-1')
+
+        if self._size is None:
+            self._size = len(self._buffer) * 8
 
     #-----------------------------------
     #            FROM
     #-----------------------------------
-    
-    def fromDec(self, d, pad=None):
-        result = ''
 
-        while d > 0:
-            result = str(d % 2) + result
-            d = int(d / 2)
-        
-        while pad and len(result) < pad:
-            result = '0' + result
+    def fromBin(self, bits):
+        # an owned Binary copies the bytes of a view rather than pinning a
+        # memoryview of the parent buffer
+        if isinstance(bits, BinaryView):
+            self.load(bytes(bits.buffer), bits.size)
+            return
 
-        self.binary = result
+        if isinstance(bits, Binary):
+            self._buffer = bits._buffer
+            self._size = bits._size
+            self.source = bits.source
+            self.encoded = bits.encoded
+            return
 
-    def fromHex(self, h):
-        data = ''
+        self.load(bitsToBytes(bits), len(bits))
 
-        for digit in h:
-            data = data + self.decToBin[self.decToHex.index(digit.lower())]
-        
-        self.binary = data
+    def fromBytes(self, data):
+        data = bytes(data)
+        self.load(data, len(data) * 8)
+
+    def fromDec(self, d, pad=None, byteorder='big'):
+        size = d.bit_length()
+
+        if pad and size < pad:
+            size = pad
+
+        # little-endian values are always a whole number of bytes
+        if byteorder == 'little':
+            size += -size % 8
+            self.load(intToBytes(d, size // 8, 'little'), size)
+            return
+
+        padBits = -size % 8
+        self.load(intToBytes(d << padBits, (size + padBits) // 8), size)
+        self.source = (d, 10)
+
+    def fromHex(self, h):
+        self.defer(h, 16, len(h) * 4)
 
     def fromBase64(self, data):
-        self.fromHex(binascii.hexlify(base64.b64decode(data)).decode("utf-8"))
+        self.defer(data, 64)
 
     def fromAscii(self, ascii):
-        data = ''
-        for c in ascii:
-            hex = format(ord(c), "x")
-            if len(hex) == 1:
-                hex = '0' + hex
-            data = data + hex
-        self.fromHex(data)
+        self.defer(ascii, 128, len(ascii) * 8)
+
+    @classmethod
+    def iterFile(cls, path, encoding='base64', chunkSize=FILE_CHUNK):
+        # decodes a line-wrapped base64/hex file a chunk at a time, carrying
+        # the characters that do not complete a base64 quantum or a hex byte
+        # over to the next chunk
+        if encoding == 'base64':
+            decode, quantum = binascii.a2b_base64, 4
+        elif encoding == 'hex':
+            decode, quantum = binascii.unhexlify, 2
+        else:
+            raise ValueError('Encoding must be base64 or hex (is {})'.format(encoding))
+
+        pending = b''
+
+        with open(path, 'rb') as file:
+            for text in iter(lambda: file.read(chunkSize), b''):
+                text = pending + b''.join(text.split())
+                end = len(text) - len(text) % quantum
+                pending = text[end:]
+
+                if end:
+                    yield Binary(decode(text[:end]), 256)
+
+        if pending:
+            yield Binary(decode(pending), 256)
+
+    @classmethod
+    def fromFile(cls, path, encoding='base64'):
+        data = bytearray()
+
+        for chunk in cls.iterFile(path, encoding):
+            data += chunk.buffer
+
+        return Binary(data, 256)
 
     #-----------------------------------
     #               TO
     #-----------------------------------
 
-    def toDec(self):
-        result = 0
-        for i in range(len(self.binary)):
-            if self.binary[len(self.binary) - 1 - i] == '1':
-                result += pow(2,i)
-        return result
+    def encode(self, base):
+        if self.encoded is None:
+            self.encoded = {}
+        elif base in self.encoded:
+            return self.encoded[base]
+
+        # base64 text is not reused as it may hold line breaks or other
+        # characters the decoder skips
+        source, sourceBase = self.source or (None, None)
+        reuse = sourceBase == base and base != 64 and (base != 128 or all(ord(c) < 128 for c in source))
+
+        if reuse and base == 16:
+            value = source.lower()
+        elif reuse:
+            value = source
+        elif base == 10:
+            value = bytesToInt(self.buffer) >> (len(self.buffer) * 8 - self.size)
+        elif base == 16:
+            value = binascii.hexlify(self.buffer).decode('utf-8')[:(self.size + 3) // 4]
+        elif base == 64:
+            value = base64.b64encode(self.buffer).decode('utf-8')
+        elif base == 128:
+            value = str(self.buffer, 'utf-8')
+
+        self.encoded[base] = value
+        return value
+
+    def toDec(self, byteorder='big'):
+        if byteorder == 'little':
+            return bytesToInt(self.buffer, 'little')
+
+        return self.encode(10)
 
     def toHex(self):
-        result = ''
-        for i in range(0, len(self.binary), 4):
-            result  = result + self.decToHex[self.decToBin.index(self.binary[i:i+4])] 
-        return result
+        return self.encode(16)
 
     def toBase64(self):
-        return base64.b64encode(binascii.unhexlify(self.toHex())).decode("utf-8")
+        return self.encode(64)
 
     def toAscii(self):
-        result = ''
-        hex = self.toHex()
-        return codecs.decode(hex, "hex").decode('utf-8')
+        return self.encode(128)
+
+    def toBytes(self):
+        return bytes(self.buffer)
 
     #-----------------------------------
     #             OPERATORS
     #-----------------------------------
 
     def __xor__(self, other):
-        result = ''
-        binary = self.binary
+        if self.size % 8 or other.size % 8:
+            division = int(self.size / other.size)
+            remainder = self.size % other.size
+            key = other.binary * division + other.binary[:remainder]
 
-        division = int(len(binary) / len(other.binary))
-        remainder = len(binary) % len(other.binary)
-        
-        other = other.binary * division + other.binary[:remainder]
-
-        for i in range(len(binary)):
-            if binary[i] == other[i]:
-                result += '0'
-            else:
-                result += '1'
+            if not self.size:
+                return Binary()
 
-        newBinary = Binary(result)
+            return Binary(format(int(self.binary, 2) ^ int(key, 2), '0{}b'.format(self.size)))
 
-        return newBinary
+        return Binary(xorBytes(self.buffer, other.buffer), 256)
 
     def __add__(self, other):
-        return Binary(self.binary + other.binary)
+        if self.size % 8:
+            return Binary(self.binary + other.binary)
 
-    def __eq__(self, other):
-        if len(self.binary) != len(other.binary):
-            return False
+        result = Binary()
+        result.load(b''.join((self.buffer, other.buffer)), self.size + other.size)
+        return result
 
-        for i in range(len(self.binary)):
-            if self.binary[i] != other.binary[i]:
-                return False
+    def __eq__(self, other):
+        if not isinstance(other, Binary):
+            return NotImplemented
 
-        return True
+        return self.size == other.size and self.buffer == other.buffer
 
     def __getitem__(self, i):
-        return self.binary[i]
+        if not isinstance(i, slice):
+            return self.binary[i]
+
+        start, stop, step = i.indices(self.size)
+
+        if step != 1 or start % 8 or stop % 8:
+            return Binary(self.binary[i])
+
+        stop = max(start, stop)
+        return BinaryView(memoryview(self.buffer)[start // 8:stop // 8], stop - start)
 
     def __len__(self):
-        return len(self.binary)
+        return self.size
 
     def __str__(self):
         return self.binary
 
+    def __getstate__(self):
+        return (bytes(self.buffer), self.size)
+
+    def __setstate__(self, state):
+        self.load(*state)
+
     #-----------------------------------
     #             OTHER
     #-----------------------------------
 
-    def pkcs_7(self, size):
-        result = self.binary
-        missing = int((size - len(result)) / 8)
-        add = Binary(missing, 10, 8)
+    def iterBlocks(self, size):
+        if size % 8 or self.size % 8:
+            for start in range(0, self.size, size):
+                yield self[start:start + size]
+            return
 
-        for byte in range(missing):
-            result += add.binary
-            
-        return Binary(result)
+        view = memoryview(self.buffer)
+        step = size // 8
+
+        for start in range(0, len(view), step):
+            block = view[start:start + step]
+            yield BinaryView(block, len(block) * 8)
+
+    def pkcs_7(self, size):
+        missing = max(int((size - len(self)) / 8), 0)
+        return self + Binary(intToBytes(missing, 1) * missing, 256)
 
     @classmethod
-    def random(cls, size):
-        data = ''
+    def random(cls, size, pool=None):
+        data = bytearray((pool or randomPool).read((size + 7) // 8))
 
-        for i in range(size):
-            data += str(random.randrange(2))
-        
-        return Binary(data)
+        if size % 8:
+            data[-1] &= 0xff << (8 - size % 8) & 0xff
+
+        result = Binary()
+        result.load(bytes(data), size)
+        return result
+
+class BinaryView(Binary):
+    # a slice of another Binary sharing its buffer instead of copying it, which
+    # is what slicing a Binary on byte boundaries returns
+    __slots__ = ()
+
+    def __init__(self, buffer, size):
+        self.load(buffer, size)
+
+    def __hash__(self):
+        return hash(self.buffer)
+
+class Corpus:
+    # memory-mapped file holding one encoded record per line, with the line
+    # offsets indexed once so that records can be decoded on demand
+
+    def __init__(self, path, encoding='hex'):
+        if encoding == 'hex':
+            self.decode = binascii.unhexlify
+        elif encoding == 'base64':
+            self.decode = binascii.a2b_base64
+        else:
+            raise ValueError('Encoding must be base64 or hex (is {})'.format(encoding))
+
+        self.path = path
+        self.encoding = encoding
+        self.open()
+        self.offsets = self.index()
+
+    def open(self):
+        with open(self.path, 'rb') as file:
+            try:
+                self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError: # empty file
+                self.map = b''
+
+    def index(self):
+        # newline offsets found FILE_CHUNK bytes of the map at a time, so the
+        # scan never holds more than one window in memory
+        offsets = array.array('q', [0])
+
+        for start in range(0, len(self.map), FILE_CHUNK):
+            stop = min(start + FILE_CHUNK, len(self.map))
+
+            if numpy is not None:
+                window = numpy.frombuffer(self.map[start:stop], numpy.uint8)
+                offsets.extend((numpy.flatnonzero(window == 10) + start + 1).tolist())
+            else:
+                position = self.map.find(b'\n', start, stop)
+                while position != -1:
+                    offsets.append(position + 1)
+                    position = self.map.find(b'\n', position + 1, stop)
+
+        if offsets[-1] != len(self.map):
+            offsets.append(len(self.map))
+
+        return offsets
+
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def raw(self, i):
+        return self.map[self.offsets[i]:self.offsets[i + 1]].rstrip()
+
+    def iterRecords(self, start=0, stop=None):
+        if stop is None or stop > len(self):
+            stop = len(self)
+
+        for i in range(start, stop):
+            yield (i, Binary(self.decode(self.raw(i)), 256))
+
+    def chunks(self, size, start=0):
+        for chunkStart in range(start, len(self), size):
+            yield (chunkStart, min(chunkStart + size, len(self)))
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+
+        if i < 0 or i >= len(self):
+            raise IndexError('Record {} out of range'.format(i))
+
+        return Binary(self.decode(self.raw(i)), 256)
+
+    def __iter__(self):
+        for i, record in self.iterRecords():
+            yield record
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getstate__(self):
+        return (self.path, self.encoding, self.offsets)
+
+    def __setstate__(self, state):
+        self.path, self.encoding, self.offsets = state
+        self.decode = binascii.unhexlify if self.encoding == 'hex' else binascii.a2b_base64
+        self.open()
 
 class Line:
+    __slots__ = ('data',)
+
     def __init__(self, data, lineData=None):
         
         if lineData != None:
@@ -220,6 +1245,8 @@ class Line:
         return Line(data)
 
 class State:
+    __slots__ = ('data',)
+
     def __init__(self, data='', keySize=0, stateData=None):
 
         if keySize not in [128, 192, 256]:
@@ -312,146 +1339,28 @@ class State:
 
         return output + '\n'
 
-    def mul(self, matrix):
-        mul2 = [
-            0x00,0x02,0x04,0x06,0x08,0x0a,0x0c,0x0e,0x10,0x12,0x14,0x16,0x18,0x1a,0x1c,0x1e,
-            0x20,0x22,0x24,0x26,0x28,0x2a,0x2c,0x2e,0x30,0x32,0x34,0x36,0x38,0x3a,0x3c,0x3e,
-            0x40,0x42,0x44,0x46,0x48,0x4a,0x4c,0x4e,0x50,0x52,0x54,0x56,0x58,0x5a,0x5c,0x5e,
-            0x60,0x62,0x64,0x66,0x68,0x6a,0x6c,0x6e,0x70,0x72,0x74,0x76,0x78,0x7a,0x7c,0x7e,
-            0x80,0x82,0x84,0x86,0x88,0x8a,0x8c,0x8e,0x90,0x92,0x94,0x96,0x98,0x9a,0x9c,0x9e,
-            0xa0,0xa2,0xa4,0xa6,0xa8,0xaa,0xac,0xae,0xb0,0xb2,0xb4,0xb6,0xb8,0xba,0xbc,0xbe,
-            0xc0,0xc2,0xc4,0xc6,0xc8,0xca,0xcc,0xce,0xd0,0xd2,0xd4,0xd6,0xd8,0xda,0xdc,0xde,
-            0xe0,0xe2,0xe4,0xe6,0xe8,0xea,0xec,0xee,0xf0,0xf2,0xf4,0xf6,0xf8,0xfa,0xfc,0xfe,
-            0x1b,0x19,0x1f,0x1d,0x13,0x11,0x17,0x15,0x0b,0x09,0x0f,0x0d,0x03,0x01,0x07,0x05,
-            0x3b,0x39,0x3f,0x3d,0x33,0x31,0x37,0x35,0x2b,0x29,0x2f,0x2d,0x23,0x21,0x27,0x25,
-            0x5b,0x59,0x5f,0x5d,0x53,0x51,0x57,0x55,0x4b,0x49,0x4f,0x4d,0x43,0x41,0x47,0x45,
-            0x7b,0x79,0x7f,0x7d,0x73,0x71,0x77,0x75,0x6b,0x69,0x6f,0x6d,0x63,0x61,0x67,0x65,
-            0x9b,0x99,0x9f,0x9d,0x93,0x91,0x97,0x95,0x8b,0x89,0x8f,0x8d,0x83,0x81,0x87,0x85,
-            0xbb,0xb9,0xbf,0xbd,0xb3,0xb1,0xb7,0xb5,0xab,0xa9,0xaf,0xad,0xa3,0xa1,0xa7,0xa5,
-            0xdb,0xd9,0xdf,0xdd,0xd3,0xd1,0xd7,0xd5,0xcb,0xc9,0xcf,0xcd,0xc3,0xc1,0xc7,0xc5,
-            0xfb,0xf9,0xff,0xfd,0xf3,0xf1,0xf7,0xf5,0xeb,0xe9,0xef,0xed,0xe3,0xe1,0xe7,0xe5
-        ]
+    def transform(self, step):
+        block = AESState.fromState(self)
+        getattr(block, step)()
+        self.data = block.toState().data
 
-        mul3 = [
-            0x00,0x03,0x06,0x05,0x0c,0x0f,0x0a,0x09,0x18,0x1b,0x1e,0x1d,0x14,0x17,0x12,0x11,
-            0x30,0x33,0x36,0x35,0x3c,0x3f,0x3a,0x39,0x28,0x2b,0x2e,0x2d,0x24,0x27,0x22,0x21,
-            0x60,0x63,0x66,0x65,0x6c,0x6f,0x6a,0x69,0x78,0x7b,0x7e,0x7d,0x74,0x77,0x72,0x71,
-            0x50,0x53,0x56,0x55,0x5c,0x5f,0x5a,0x59,0x48,0x4b,0x4e,0x4d,0x44,0x47,0x42,0x41,
-            0xc0,0xc3,0xc6,0xc5,0xcc,0xcf,0xca,0xc9,0xd8,0xdb,0xde,0xdd,0xd4,0xd7,0xd2,0xd1,
-            0xf0,0xf3,0xf6,0xf5,0xfc,0xff,0xfa,0xf9,0xe8,0xeb,0xee,0xed,0xe4,0xe7,0xe2,0xe1,
-            0xa0,0xa3,0xa6,0xa5,0xac,0xaf,0xaa,0xa9,0xb8,0xbb,0xbe,0xbd,0xb4,0xb7,0xb2,0xb1,
-            0x90,0x93,0x96,0x95,0x9c,0x9f,0x9a,0x99,0x88,0x8b,0x8e,0x8d,0x84,0x87,0x82,0x81,
-            0x9b,0x98,0x9d,0x9e,0x97,0x94,0x91,0x92,0x83,0x80,0x85,0x86,0x8f,0x8c,0x89,0x8a,
-            0xab,0xa8,0xad,0xae,0xa7,0xa4,0xa1,0xa2,0xb3,0xb0,0xb5,0xb6,0xbf,0xbc,0xb9,0xba,
-            0xfb,0xf8,0xfd,0xfe,0xf7,0xf4,0xf1,0xf2,0xe3,0xe0,0xe5,0xe6,0xef,0xec,0xe9,0xea,
-            0xcb,0xc8,0xcd,0xce,0xc7,0xc4,0xc1,0xc2,0xd3,0xd0,0xd5,0xd6,0xdf,0xdc,0xd9,0xda,
-            0x5b,0x58,0x5d,0x5e,0x57,0x54,0x51,0x52,0x43,0x40,0x45,0x46,0x4f,0x4c,0x49,0x4a,
-            0x6b,0x68,0x6d,0x6e,0x67,0x64,0x61,0x62,0x73,0x70,0x75,0x76,0x7f,0x7c,0x79,0x7a,
-            0x3b,0x38,0x3d,0x3e,0x37,0x34,0x31,0x32,0x23,0x20,0x25,0x26,0x2f,0x2c,0x29,0x2a,
-            0x0b,0x08,0x0d,0x0e,0x07,0x04,0x01,0x02,0x13,0x10,0x15,0x16,0x1f,0x1c,0x19,0x1a
-        ]
+    def subBytes(self):
+        self.transform('subBytes')
 
-        mul9 = [
-            0x00,0x09,0x12,0x1b,0x24,0x2d,0x36,0x3f,0x48,0x41,0x5a,0x53,0x6c,0x65,0x7e,0x77,
-            0x90,0x99,0x82,0x8b,0xb4,0xbd,0xa6,0xaf,0xd8,0xd1,0xca,0xc3,0xfc,0xf5,0xee,0xe7,
-            0x3b,0x32,0x29,0x20,0x1f,0x16,0x0d,0x04,0x73,0x7a,0x61,0x68,0x57,0x5e,0x45,0x4c,
-            0xab,0xa2,0xb9,0xb0,0x8f,0x86,0x9d,0x94,0xe3,0xea,0xf1,0xf8,0xc7,0xce,0xd5,0xdc,
-            0x76,0x7f,0x64,0x6d,0x52,0x5b,0x40,0x49,0x3e,0x37,0x2c,0x25,0x1a,0x13,0x08,0x01,
-            0xe6,0xef,0xf4,0xfd,0xc2,0xcb,0xd0,0xd9,0xae,0xa7,0xbc,0xb5,0x8a,0x83,0x98,0x91,
-            0x4d,0x44,0x5f,0x56,0x69,0x60,0x7b,0x72,0x05,0x0c,0x17,0x1e,0x21,0x28,0x33,0x3a,
-            0xdd,0xd4,0xcf,0xc6,0xf9,0xf0,0xeb,0xe2,0x95,0x9c,0x87,0x8e,0xb1,0xb8,0xa3,0xaa,
-            0xec,0xe5,0xfe,0xf7,0xc8,0xc1,0xda,0xd3,0xa4,0xad,0xb6,0xbf,0x80,0x89,0x92,0x9b,
-            0x7c,0x75,0x6e,0x67,0x58,0x51,0x4a,0x43,0x34,0x3d,0x26,0x2f,0x10,0x19,0x02,0x0b,
-            0xd7,0xde,0xc5,0xcc,0xf3,0xfa,0xe1,0xe8,0x9f,0x96,0x8d,0x84,0xbb,0xb2,0xa9,0xa0,
-            0x47,0x4e,0x55,0x5c,0x63,0x6a,0x71,0x78,0x0f,0x06,0x1d,0x14,0x2b,0x22,0x39,0x30,
-            0x9a,0x93,0x88,0x81,0xbe,0xb7,0xac,0xa5,0xd2,0xdb,0xc0,0xc9,0xf6,0xff,0xe4,0xed,
-            0x0a,0x03,0x18,0x11,0x2e,0x27,0x3c,0x35,0x42,0x4b,0x50,0x59,0x66,0x6f,0x74,0x7d,
-            0xa1,0xa8,0xb3,0xba,0x85,0x8c,0x97,0x9e,0xe9,0xe0,0xfb,0xf2,0xcd,0xc4,0xdf,0xd6,
-            0x31,0x38,0x23,0x2a,0x15,0x1c,0x07,0x0e,0x79,0x70,0x6b,0x62,0x5d,0x54,0x4f,0x46
-        ]
+    def subBytes_inv(self):
+        self.transform('subBytes_inv')
 
-        mul11 = [
-            0x00,0x0b,0x16,0x1d,0x2c,0x27,0x3a,0x31,0x58,0x53,0x4e,0x45,0x74,0x7f,0x62,0x69,
-            0xb0,0xbb,0xa6,0xad,0x9c,0x97,0x8a,0x81,0xe8,0xe3,0xfe,0xf5,0xc4,0xcf,0xd2,0xd9,
-            0x7b,0x70,0x6d,0x66,0x57,0x5c,0x41,0x4a,0x23,0x28,0x35,0x3e,0x0f,0x04,0x19,0x12,
-            0xcb,0xc0,0xdd,0xd6,0xe7,0xec,0xf1,0xfa,0x93,0x98,0x85,0x8e,0xbf,0xb4,0xa9,0xa2,
-            0xf6,0xfd,0xe0,0xeb,0xda,0xd1,0xcc,0xc7,0xae,0xa5,0xb8,0xb3,0x82,0x89,0x94,0x9f,
-            0x46,0x4d,0x50,0x5b,0x6a,0x61,0x7c,0x77,0x1e,0x15,0x08,0x03,0x32,0x39,0x24,0x2f,
-            0x8d,0x86,0x9b,0x90,0xa1,0xaa,0xb7,0xbc,0xd5,0xde,0xc3,0xc8,0xf9,0xf2,0xef,0xe4,
-            0x3d,0x36,0x2b,0x20,0x11,0x1a,0x07,0x0c,0x65,0x6e,0x73,0x78,0x49,0x42,0x5f,0x54,
-            0xf7,0xfc,0xe1,0xea,0xdb,0xd0,0xcd,0xc6,0xaf,0xa4,0xb9,0xb2,0x83,0x88,0x95,0x9e,
-            0x47,0x4c,0x51,0x5a,0x6b,0x60,0x7d,0x76,0x1f,0x14,0x09,0x02,0x33,0x38,0x25,0x2e,
-            0x8c,0x87,0x9a,0x91,0xa0,0xab,0xb6,0xbd,0xd4,0xdf,0xc2,0xc9,0xf8,0xf3,0xee,0xe5,
-            0x3c,0x37,0x2a,0x21,0x10,0x1b,0x06,0x0d,0x64,0x6f,0x72,0x79,0x48,0x43,0x5e,0x55,
-            0x01,0x0a,0x17,0x1c,0x2d,0x26,0x3b,0x30,0x59,0x52,0x4f,0x44,0x75,0x7e,0x63,0x68,
-            0xb1,0xba,0xa7,0xac,0x9d,0x96,0x8b,0x80,0xe9,0xe2,0xff,0xf4,0xc5,0xce,0xd3,0xd8,
-            0x7a,0x71,0x6c,0x67,0x56,0x5d,0x40,0x4b,0x22,0x29,0x34,0x3f,0x0e,0x05,0x18,0x13,
-            0xca,0xc1,0xdc,0xd7,0xe6,0xed,0xf0,0xfb,0x92,0x99,0x84,0x8f,0xbe,0xb5,0xa8,0xa3
-        ]
+    def shiftRows(self):
+        self.transform('shiftRows')
 
-        mul13 = [
-            0x00,0x0d,0x1a,0x17,0x34,0x39,0x2e,0x23,0x68,0x65,0x72,0x7f,0x5c,0x51,0x46,0x4b,
-            0xd0,0xdd,0xca,0xc7,0xe4,0xe9,0xfe,0xf3,0xb8,0xb5,0xa2,0xaf,0x8c,0x81,0x96,0x9b,
-            0xbb,0xb6,0xa1,0xac,0x8f,0x82,0x95,0x98,0xd3,0xde,0xc9,0xc4,0xe7,0xea,0xfd,0xf0,
-            0x6b,0x66,0x71,0x7c,0x5f,0x52,0x45,0x48,0x03,0x0e,0x19,0x14,0x37,0x3a,0x2d,0x20,
-            0x6d,0x60,0x77,0x7a,0x59,0x54,0x43,0x4e,0x05,0x08,0x1f,0x12,0x31,0x3c,0x2b,0x26,
-            0xbd,0xb0,0xa7,0xaa,0x89,0x84,0x93,0x9e,0xd5,0xd8,0xcf,0xc2,0xe1,0xec,0xfb,0xf6,
-            0xd6,0xdb,0xcc,0xc1,0xe2,0xef,0xf8,0xf5,0xbe,0xb3,0xa4,0xa9,0x8a,0x87,0x90,0x9d,
-            0x06,0x0b,0x1c,0x11,0x32,0x3f,0x28,0x25,0x6e,0x63,0x74,0x79,0x5a,0x57,0x40,0x4d,
-            0xda,0xd7,0xc0,0xcd,0xee,0xe3,0xf4,0xf9,0xb2,0xbf,0xa8,0xa5,0x86,0x8b,0x9c,0x91,
-            0x0a,0x07,0x10,0x1d,0x3e,0x33,0x24,0x29,0x62,0x6f,0x78,0x75,0x56,0x5b,0x4c,0x41,
-            0x61,0x6c,0x7b,0x76,0x55,0x58,0x4f,0x42,0x09,0x04,0x13,0x1e,0x3d,0x30,0x27,0x2a,
-            0xb1,0xbc,0xab,0xa6,0x85,0x88,0x9f,0x92,0xd9,0xd4,0xc3,0xce,0xed,0xe0,0xf7,0xfa,
-            0xb7,0xba,0xad,0xa0,0x83,0x8e,0x99,0x94,0xdf,0xd2,0xc5,0xc8,0xeb,0xe6,0xf1,0xfc,
-            0x67,0x6a,0x7d,0x70,0x53,0x5e,0x49,0x44,0x0f,0x02,0x15,0x18,0x3b,0x36,0x21,0x2c,
-            0x0c,0x01,0x16,0x1b,0x38,0x35,0x22,0x2f,0x64,0x69,0x7e,0x73,0x50,0x5d,0x4a,0x47,
-            0xdc,0xd1,0xc6,0xcb,0xe8,0xe5,0xf2,0xff,0xb4,0xb9,0xae,0xa3,0x80,0x8d,0x9a,0x97
-        ]
+    def shiftRows_inv(self):
+        self.transform('shiftRows_inv')
 
-        mul14 = [
-            0x00,0x0e,0x1c,0x12,0x38,0x36,0x24,0x2a,0x70,0x7e,0x6c,0x62,0x48,0x46,0x54,0x5a,
-            0xe0,0xee,0xfc,0xf2,0xd8,0xd6,0xc4,0xca,0x90,0x9e,0x8c,0x82,0xa8,0xa6,0xb4,0xba,
-            0xdb,0xd5,0xc7,0xc9,0xe3,0xed,0xff,0xf1,0xab,0xa5,0xb7,0xb9,0x93,0x9d,0x8f,0x81,
-            0x3b,0x35,0x27,0x29,0x03,0x0d,0x1f,0x11,0x4b,0x45,0x57,0x59,0x73,0x7d,0x6f,0x61,
-            0xad,0xa3,0xb1,0xbf,0x95,0x9b,0x89,0x87,0xdd,0xd3,0xc1,0xcf,0xe5,0xeb,0xf9,0xf7,
-            0x4d,0x43,0x51,0x5f,0x75,0x7b,0x69,0x67,0x3d,0x33,0x21,0x2f,0x05,0x0b,0x19,0x17,
-            0x76,0x78,0x6a,0x64,0x4e,0x40,0x52,0x5c,0x06,0x08,0x1a,0x14,0x3e,0x30,0x22,0x2c,
-            0x96,0x98,0x8a,0x84,0xae,0xa0,0xb2,0xbc,0xe6,0xe8,0xfa,0xf4,0xde,0xd0,0xc2,0xcc,
-            0x41,0x4f,0x5d,0x53,0x79,0x77,0x65,0x6b,0x31,0x3f,0x2d,0x23,0x09,0x07,0x15,0x1b,
-            0xa1,0xaf,0xbd,0xb3,0x99,0x97,0x85,0x8b,0xd1,0xdf,0xcd,0xc3,0xe9,0xe7,0xf5,0xfb,
-            0x9a,0x94,0x86,0x88,0xa2,0xac,0xbe,0xb0,0xea,0xe4,0xf6,0xf8,0xd2,0xdc,0xce,0xc0,
-            0x7a,0x74,0x66,0x68,0x42,0x4c,0x5e,0x50,0x0a,0x04,0x16,0x18,0x32,0x3c,0x2e,0x20,
-            0xec,0xe2,0xf0,0xfe,0xd4,0xda,0xc8,0xc6,0x9c,0x92,0x80,0x8e,0xa4,0xaa,0xb8,0xb6,
-            0x0c,0x02,0x10,0x1e,0x34,0x3a,0x28,0x26,0x7c,0x72,0x60,0x6e,0x44,0x4a,0x58,0x56,
-            0x37,0x39,0x2b,0x25,0x0f,0x01,0x13,0x1d,0x47,0x49,0x5b,0x55,0x7f,0x71,0x63,0x6d,
-            0xd7,0xd9,0xcb,0xc5,0xef,0xe1,0xf3,0xfd,0xa7,0xa9,0xbb,0xb5,0x9f,0x91,0x83,0x8d
-        ]
+    def mixColumns(self):
+        self.transform('mixColumns')
 
-        newState = []
-
-        for line in range(self.lenLines()):
-            newLine = []
-            for matrixByte in range(len(matrix[0])):
-                newValue = Binary('00', 16)
-                for matrixLine in range(len(matrix)):
-                    if matrix[matrixLine][matrixByte] == 1:
-                        newValue = newValue ^ self[line][matrixLine]
-                    elif matrix[matrixLine][matrixByte] == 2:
-                        newValue = newValue ^ Binary(format(mul2[self[line][matrixLine].toDec()], '02x'), 16)
-                    elif matrix[matrixLine][matrixByte] == 3:
-                        newValue = newValue ^ Binary(format(mul3[self[line][matrixLine].toDec()], '02x'), 16)
-                    elif matrix[matrixLine][matrixByte] == 9:
-                        newValue = newValue ^ Binary(format(mul9[self[line][matrixLine].toDec()], '02x'), 16)
-                    elif matrix[matrixLine][matrixByte] == 11:
-                        newValue = newValue ^ Binary(format(mul11[self[line][matrixLine].toDec()], '02x'), 16)
-                    elif matrix[matrixLine][matrixByte] == 13:
-                        newValue = newValue ^ Binary(format(mul13[self[line][matrixLine].toDec()], '02x'), 16)
-                    elif matrix[matrixLine][matrixByte] == 14:
-                        newValue = newValue ^ Binary(format(mul14[self[line][matrixLine].toDec()], '02x'), 16)
-                    else:
-                        raise ValueError('Multiplication with {} not expected'.format(matrix[matrixLine][matrixByte]))
-                newLine.append(newValue)
-            self[line] = Line('', newLine)
+    def mixColumns_inv(self):
+        self.transform('mixColumns_inv')
 
     def getData(self):
         data = ''
@@ -460,29 +1369,325 @@ class State:
                 data += byte.binary
         return data
 
+class AESState:
+    # a 16-byte AES block held in one bytearray, byte r of column c at
+    # 4 * c + r, that every round step transforms in place
+    __slots__ = ('data',)
+
+    def __init__(self, data=bytes(16)):
+        self.data = bytearray(data)
+
+    @classmethod
+    def fromState(cls, state):
+        return cls(Binary(state.getData()).toBytes())
+
+    def toState(self):
+        return State(Binary(bytes(self.data), 256), 128)
+
+    def addRoundKey(self, roundKeys, offset=0):
+        data = self.data
+
+        for i in range(16):
+            data[i] ^= roundKeys[offset + i]
+
+    def subBytes(self):
+        data = self.data
+
+        for i in range(16):
+            data[i] = SBOX[data[i]]
+
+    def subBytes_inv(self):
+        data = self.data
+
+        for i in range(16):
+            data[i] = SBOX_INV[data[i]]
+
+    def shiftRows(self):
+        data = self.data
+
+        temp = data[1]
+        data[1] = data[5]
+        data[5] = data[9]
+        data[9] = data[13]
+        data[13] = temp
+
+        data[2], data[10] = data[10], data[2]
+        data[6], data[14] = data[14], data[6]
+
+        temp = data[15]
+        data[15] = data[11]
+        data[11] = data[7]
+        data[7] = data[3]
+        data[3] = temp
+
+    def shiftRows_inv(self):
+        data = self.data
+
+        temp = data[13]
+        data[13] = data[9]
+        data[9] = data[5]
+        data[5] = data[1]
+        data[1] = temp
+
+        data[2], data[10] = data[10], data[2]
+        data[6], data[14] = data[14], data[6]
+
+        temp = data[3]
+        data[3] = data[7]
+        data[7] = data[11]
+        data[11] = data[15]
+        data[15] = temp
+
+    def mixColumns(self):
+        data = self.data
+
+        for c in range(0, 16, 4):
+            a0 = data[c]
+            a1 = data[c + 1]
+            a2 = data[c + 2]
+            a3 = data[c + 3]
+            data[c] = MUL2[a0] ^ MUL3[a1] ^ a2 ^ a3
+            data[c + 1] = a0 ^ MUL2[a1] ^ MUL3[a2] ^ a3
+            data[c + 2] = a0 ^ a1 ^ MUL2[a2] ^ MUL3[a3]
+            data[c + 3] = MUL3[a0] ^ a1 ^ a2 ^ MUL2[a3]
+
+    def mixColumns_inv(self):
+        data = self.data
+
+        for c in range(0, 16, 4):
+            a0 = data[c]
+            a1 = data[c + 1]
+            a2 = data[c + 2]
+            a3 = data[c + 3]
+            data[c] = MUL14[a0] ^ MUL11[a1] ^ MUL13[a2] ^ MUL9[a3]
+            data[c + 1] = MUL9[a0] ^ MUL14[a1] ^ MUL11[a2] ^ MUL13[a3]
+            data[c + 2] = MUL13[a0] ^ MUL9[a1] ^ MUL14[a2] ^ MUL11[a3]
+            data[c + 3] = MUL11[a0] ^ MUL13[a1] ^ MUL9[a2] ^ MUL14[a3]
+
+    def __str__(self):
+        output = ''
+
+        for row in range(4):
+            output += '| '
+            for column in range(4):
+                output += format(self.data[4 * column + row], '02x') + ' '
+            output += '|\n'
+
+        return output + '\n'
+
+LETTER_FREQ = {
+    'a':	0.08167, 'b':	0.01492,
+    'c':	0.02782, 'd':	0.04253,
+    'e':	0.12702, 'f':	0.02228,
+    'g':	0.02015, 'h':	0.06094,
+    'i':	0.06966, 'j':	0.00153,
+    'k':	0.00772, 'l':	0.04025,
+    'm':	0.02406, 'n':	0.06749,
+    'o':	0.07507, 'p':	0.01929,
+    'q':	0.00095, 'r':	0.05987,
+    's':	0.06327, 't':	0.09056,
+    'u':	0.02758, 'v':	0.00978,
+    'w':	0.02360, 'x':	0.00150,
+    'y':	0.01974, 'z':	0.00074
+}
+
+def byteScore(byte):
+    # weight of one plaintext byte in englishLetterFreqScore, per unit of length
+    c = chr(byte).lower()
+
+    if c in LETTER_FREQ:
+        return LETTER_FREQ[c]
+    elif c == ' ':
+        return 1
+    elif byte < 32:
+        return -2
+    return 0
+
+# SCORE_TABLE[k][b]: weight of ciphertext byte b decrypted with key k
+BYTE_SCORES = [byteScore(byte) for byte in range(256)]
+SCORE_TABLE = [[BYTE_SCORES[b ^ k] for b in range(256)] for k in range(256)]
+
+# plaintext bytes in the order the padding oracle attack tries them: English
+# text first, then the remaining bytes
+PADDING_GUESSES = bytes(collections.OrderedDict.fromkeys(
+    b' etaoinshrdlcumwfgypbvkjxqz' + b'ETAOINSHRDLCUMWFGYPBVKJXQZ' + b'0123456789' +
+    b'.,\'"!?-:;()\n' + bytes(range(256))
+))
+
+class AESCounter:
+    # AES-CTR keystream with random access. Counter blocks are the nonce
+    # followed by the block counter packed with counterFormat, so '<Q' after
+    # an 8-byte nonce or '>I' after a 12-byte one. With cacheSize, that many
+    # batches of CTR_BATCH keystream blocks are kept for repeated reads
+
+    def __init__(self, key, nonce=None, counterFormat='<Q', counter=0, cacheSize=0):
+        self.roundKeys, decKeys, self.rounds = Crypto.expandKey(key)
+        self.counterFormat = counterFormat
+        self.counterSize = struct.calcsize(counterFormat)
+        self.nonce = nonce.toBytes() if nonce is not None else bytes(16 - self.counterSize)
+        self.counter = counter
+        self.cacheSize = cacheSize
+        self.cache = collections.OrderedDict()
+        self.buffer = memoryview(bytearray(16 * CTR_BATCH))
+        self.position = 0
+
+        if len(self.nonce) + self.counterSize != 16:
+            raise ValueError('Nonce and counter must fill one block (have {} bytes)'.format(len(self.nonce) + self.counterSize))
+
+    def seek(self, offset):
+        if offset < 0:
+            raise ValueError('Negative offset {}'.format(offset))
+
+        self.position = offset
+
+    def tell(self):
+        return self.position
+
+    def counterBlocks(self, first, count):
+        # the counter wraps around at the width of its field
+        nonce, pack, limit = self.nonce, struct.Struct(self.counterFormat).pack, 1 << 8 * self.counterSize
+        start = self.counter + first
+        return b''.join([nonce + pack((start + i) % limit) for i in range(count)])
+
+    def batch(self, index):
+        if index in self.cache:
+            self.cache.move_to_end(index)
+            return self.cache[index]
+
+        stream = aesEncrypt(self.counterBlocks(index * CTR_BATCH, CTR_BATCH), self.roundKeys, self.rounds)
+        self.cache[index] = stream
+
+        if len(self.cache) > self.cacheSize:
+            self.cache.popitem(last=False)
+
+        return stream
+
+    def blocks(self, first, count):
+        # keystream of blocks first to first + count, all in one batch: a view
+        # of the cached batch or, without a cache, generated for exactly those
+        # blocks into the reusable buffer
+        if self.cacheSize:
+            start = first % CTR_BATCH * 16
+            return memoryview(self.batch(first // CTR_BATCH))[start:start + 16 * count]
+
+        return aesEncrypt(self.counterBlocks(first, count), self.roundKeys, self.rounds, self.buffer[:16 * count])
+
+    def keystream(self, size):
+        return bytes(self.apply(bytes(size)))
+
+    def apply(self, data, out=None):
+        # encrypts or decrypts data at the current position, up to the end of
+        # one batch of CTR_BATCH blocks at a time, into out if given (which may
+        # be data itself)
+        size = len(data)
+        data = memoryview(data)
+
+        if out is None:
+            out = bytearray(size)
+
+        view = memoryview(out)
+        done = 0
+
+        while done < size:
+            first, offset = divmod(self.position, 16)
+            count = min(CTR_BATCH - first % CTR_BATCH, (offset + size - done + 15) // 16)
+            n = min(size - done, 16 * count - offset)
+
+            stream = self.blocks(first, count)
+            xorBytes(data[done:done + n], stream[offset:offset + n], view[done:done + n])
+            done += n
+            self.position += n
+
+        return out
+
+class AESStream:
+    # incremental ECB (no IV) or CBC over chunks of any size. update() returns
+    # the blocks it could process, carrying partial blocks and the chaining
+    # block over; finalize() pads like Crypto.paddedBlocks when encrypting,
+    # or unpads the block a decryptor always holds back
+
+    def __init__(self, key, IV=None, decrypt=False):
+        self.roundKeys, self.decKeys, self.rounds = Crypto.expandKey(key)
+        self.IV = IV.toBytes() if IV is not None else None
+        self.decrypt = decrypt
+        self.pending = b''
+        self.finalized = False
+
+    def process(self, data):
+        if not data:
+            return b''
+
+        if self.decrypt:
+            if self.IV is None:
+                return aesDecrypt(data, self.decKeys, self.rounds)
+
+            out = decryptCBC(data, self.decKeys, self.rounds, self.IV)
+            self.IV = data[-16:]
+            return bytes(out)
+
+        if self.IV is None:
+            return aesEncrypt(data, self.roundKeys, self.rounds)
+
+        out = encryptBlocks(data, self.roundKeys, self.rounds, self.IV)
+        self.IV = out[-16:]
+        return out
+
+    def update(self, chunk):
+        if self.finalized:
+            raise ValueError('Stream already finalized')
+
+        data = self.pending + bytes(chunk)
+        # a decryptor keeps at least one block back for finalize to unpad
+        size = (len(data) - 1) // 16 * 16 if self.decrypt else len(data) // 16 * 16
+        size = max(size, 0)
+        self.pending = data[size:]
+
+        return self.process(data[:size])
+
+    def finalize(self):
+        if self.finalized:
+            raise ValueError('Stream already finalized')
+
+        self.finalized = True
+        data, self.pending = self.pending, b''
+
+        if not self.decrypt:
+            if data:
+                data = Binary(data, 256).pkcs_7(128).toBytes()
+            return self.process(data)
+
+        if len(data) % 16:
+            raise ValueError('Ciphertext must hold whole blocks')
+
+        if not data:
+            return b''
+
+        return Binary(Crypto.removePadding(Binary(self.process(data), 256))).toBytes()
+
+class AESCipher:
+    # factory for the streaming encryptor and decryptor of one key and IV
+
+    def __init__(self, key, IV=None):
+        self.key = key
+        self.IV = IV
+
+    def encryptor(self):
+        return AESStream(self.key, self.IV)
+
+    def decryptor(self):
+        return AESStream(self.key, self.IV, True)
+
 class Crypto:
     def __init__(self, encodedData, base=2):
         self.data = Binary(encodedData, base)
-        self.roundKeys = []
         self.cipherText = None
 
+    @classmethod
+    def fromFile(cls, path, encoding='base64'):
+        return Crypto(Binary.fromFile(path, encoding))
+
     @classmethod
     def englishLetterFreqScore(cls, data):
-        letterFreq = {
-            'a':	0.08167, 'b':	0.01492,
-            'c':	0.02782, 'd':	0.04253,
-            'e':	0.12702, 'f':	0.02228,
-            'g':	0.02015, 'h':	0.06094,
-            'i':	0.06966, 'j':	0.00153,
-            'k':	0.00772, 'l':	0.04025,
-            'm':	0.02406, 'n':	0.06749,
-            'o':	0.07507, 'p':	0.01929,
-            'q':	0.00095, 'r':	0.05987,
-            's':	0.06327, 't':	0.09056,
-            'u':	0.02758, 'v':	0.00978,
-            'w':	0.02360, 'x':	0.00150,
-            'y':	0.01974, 'z':	0.00074
-        }
         score = 1
 
         try:
@@ -491,8 +1696,8 @@ class Crypto:
             return 0
 
         for c in ascii:
-            if c in letterFreq:
-                score += letterFreq[c] * len(ascii)
+            if c in LETTER_FREQ:
+                score += LETTER_FREQ[c] * len(ascii)
             elif c == ' ':
                 score += len(ascii)
             elif ord(c) < 32:
@@ -502,19 +1707,17 @@ class Crypto:
 
     @classmethod
     def hammingDist(cls, b1, b2):
-        hd = 0
+        # differing bits between two Binary objects or bit strings, the
+        # shorter one left-padded with zeros: a popcount of their XOR
+        return popCount(cls.bitsToInt(b1) ^ cls.bitsToInt(b2))
 
-        while len(b1) > len(b2) or len(b1) < len(b2):
-            if len(b1) > len(b2):
-                b2 = '0' + b2
-            elif len(b1) < len(b2):
-                b1 = '0' + b1
+    @classmethod
+    def bitsToInt(cls, bits):
+        if isinstance(bits, Binary):
+            return bytesToInt(bits.buffer) >> (len(bits.buffer) * 8 - len(bits))
 
-        for i in range(len(b1)):
-            if b1[i] != b2[i]:
-                hd += 1
-        
-        return hd
+        bits = str(bits)
+        return int(bits, 2) if bits else 0
 
     #-----------------------------------
     #                XOR
@@ -524,54 +1727,131 @@ class Crypto:
         self.data = self.data ^ key
 
     def decSingleCharXOR(self):
-        key = Binary()
+        # englishLetterFreqScore for all 256 keys from one byte histogram:
+        # the score of key k is a dot product with row k of SCORE_TABLE, and
+        # any byte decoding to 128 or above fails the key (score 0). Only the
+        # winning key is decoded
+        data = self.data.toBytes()
+        counts = list(collections.Counter(data).items())
         bestResult = (0, '', '') # (score, key, decodedText)
+        bestKey = None
+
+        # only keys sharing the top bit of every byte decode at all
+        topBits = {b & 0x80 for b, n in counts}
+        if len(topBits) > 1:
+            return bestResult
 
-        for c in range(128):
-            key.fromAscii(chr(c))
-            score = self.englishLetterFreqScore(self.data ^ key)
+        topBit = topBits.pop() if topBits else 0
+
+        for k in range(topBit, topBit + 128):
+            row = SCORE_TABLE[k]
+            score = 1 + len(data) * sum([row[b] * n for b, n in counts])
 
             if score > bestResult[0]:
-                bestResult = (score, chr(c), (self.data ^ key).toAscii())
-        return bestResult
+                bestResult = (score, chr(k), '')
+                bestKey = k
 
-    def decXOR(self):
-        keysizes = []
+        if bestKey is None:
+            return bestResult
 
-        for keysize in range(2, 40):
-            firstPacket = self.data[:keysize * 8]
-            secondPacket = self.data[2*(keysize * 8):3*(keysize * 8)]
-            thirdPacket = self.data[3*(keysize * 8):4*(keysize * 8)]
-            fourthPacket = self.data[4*(keysize * 8):5*(keysize * 8)]
+        return (bestResult[0], bestResult[1], Binary(xorBytes(data, bytes([bestKey])), 256).toAscii())
 
-            result = self.hammingDist(firstPacket, secondPacket)
-            result += self.hammingDist(firstPacket, thirdPacket)
-            result += self.hammingDist(firstPacket, fourthPacket)
-            result += self.hammingDist(secondPacket, thirdPacket)
-            result += self.hammingDist(secondPacket, fourthPacket)
-            result += self.hammingDist(thirdPacket, fourthPacket)
-            result /= keysize * 6
+    @classmethod
+    def couldBeSingleCharXOR(cls, data, maxDistinct=XOR_MAX_DISTINCT):
+        # cheap check on the byte distribution: XOR with one byte keeps the
+        # number of distinct bytes, and text below 128 shares one top bit
+        distinct = set(data.toBytes())
+        return len(distinct) <= maxDistinct and len({b & 0x80 for b in distinct}) <= 1
+
+    @classmethod
+    def detectSingleCharXOR(cls, corpus, top=10, workers=None, maxDistinct=XOR_MAX_DISTINCT, chunkSize=CORPUS_CHUNK):
+        # decSingleCharXOR over every record of a Corpus, chunks of records
+        # going to a process pool (one chunk runs in this process). Returns the
+        # best top records as (score, line, key, plainText), best first
+        # the corpus goes to each worker once through the pool initializer
+        # (which ProcessPoolExecutor lacks before Python 3.7), tasks only
+        # carry record ranges
+        jobs = [(start, stop, top, maxDistinct) for start, stop in corpus.chunks(chunkSize)]
+
+        if len(jobs) <= 1:
+            results = [scoreRecords(*job, corpus=corpus) for job in jobs]
+        else:
+            with multiprocessing.Pool(workers, initCorpusWorker, (corpus,)) as pool:
+                results = pool.starmap(scoreRecords, jobs)
+
+        best = heapq.nlargest(top, [entry for result in results for entry in result])
+        return [(score, -line, key, plainText) for score, line, key, plainText in best]
+
+    def keySizes(self, sizes=range(2, 40), samples=None):
+        # repeating-key XOR key sizes as (normalized Hamming distance, size),
+        # most likely first. The distance is averaged over every pair of
+        # adjacent blocks, or the first samples pairs, at once: the data XORed
+        # with itself shifted by one block
+        data = self.data.toBytes()
+        keysizes = []
 
-            keysizes.append((result, keysize))
+        for keysize in sizes:
+            pairs = len(data) // keysize - 1
+            if samples is not None:
+                pairs = min(pairs, samples)
+
+            if pairs < 1:
+                continue
+
+            size = pairs * keysize
+            distance = popCount(bytesToInt(data[:size]) ^ bytesToInt(data[keysize:keysize + size]))
+            keysizes.append((distance / size, keysize))
+
+        return sorted(keysizes, key=lambda tup: tup[0])
+
+    def rankXORKeys(self, sizes=range(2, 40), candidates=None, samples=None, workers=1):
+        # repeating-key XOR keys for the candidates most likely key sizes (all
+        # of them by default) as (score, keysize, key), best first. The data
+        # is transposed into strided columns data[i::keysize], each solved as
+        # single-byte XOR, in a process pool with workers > 1. A column scores
+        # 1 + L * (sum of its byte weights), which grows with the square of
+        # its length L, so keys are ranked by the mean weight per plaintext
+        # byte instead. Multiples of the true period fit their shorter columns
+        # slightly better, so a size scoring within XOR_SIZE_TOLERANCE of a
+        # smaller one ranks right behind it
+        data = self.data.toBytes()
+        keysizes = [keysize for distance, keysize in self.keySizes(sizes, samples)[:candidates]]
+        columns = [data[i::keysize] for keysize in keysizes for i in range(keysize)]
+
+        if workers > 1:
+            with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+                solved = list(pool.map(solveColumn, columns, chunksize=max(len(columns) // (4 * workers), 1)))
+        else:
+            solved = list(map(solveColumn, columns))
 
-        keysizes = sorted(keysizes, key=lambda tup: tup[0])
         keys = []
+        position = 0
 
-        for i in range(2):
-            keysize = keysizes[i][1]
-            data = [self.data[i:i + keysize * 8] for i in range(0, len(self.data), keysize * 8)]
+        for keysize in keysizes:
+            scores, key = zip(*solved[position:position + keysize])
+            lengths = [len(data[i::keysize]) for i in range(keysize)]
+            position += keysize
 
-            key = ''
-            for byte in range(keysize):
-                grabbedBytes = ''
+            # a column no key decodes rules the size out
+            if '' not in key:
+                weight = sum([(score - 1) / length for score, length in zip(scores, lengths)])
+                keys.append((weight / len(data), keysize, ''.join(key)))
 
-                for block in data:
-                    grabbedBytes += block[byte*8:byte*8+8]
-                
-                key += Crypto(grabbedBytes).decSingleCharXOR()[1]
-            keys.append(key)
-        
-        return keys
+        weights = {keysize: weight for weight, keysize, key in keys}
+
+        def rank(entry):
+            weight, keysize, key = entry
+
+            for smaller in sorted(weights):
+                if smaller < keysize and weights[smaller] >= weight * (1 - XOR_SIZE_TOLERANCE):
+                    return (-weights[smaller], keysize)
+
+            return (-weight, keysize)
+
+        return sorted(keys, key=rank)
+
+    def decXOR(self, sizes=range(2, 40), candidates=None, samples=None, workers=1):
+        return [key for score, keysize, key in self.rankXORKeys(sizes, candidates, samples, workers)]
 
     #-----------------------------------
     #               AES
@@ -584,8 +1864,8 @@ class Crypto:
         if keySize not in [128, 192, 256]:
             raise ValueError('Key must have 128, 192 or 256 bits (has {})'.format(keySize))
 
-        for n in range(0, len(data), keySize):
-            states.append(State(data[n:n+keySize], keySize))
+        for block in data.iterBlocks(keySize):
+            states.append(State(block, keySize))
 
         return states
 
@@ -600,188 +1880,45 @@ class Crypto:
 
     @classmethod
     def rcon(cls, i, byte):
-        rcon = [
-            0x8d, 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80, 0x1b, 0x36, 0x6c, 0xd8, 0xab, 0x4d, 0x9a, 
-            0x2f, 0x5e, 0xbc, 0x63, 0xc6, 0x97, 0x35, 0x6a, 0xd4, 0xb3, 0x7d, 0xfa, 0xef, 0xc5, 0x91, 0x39, 
-            0x72, 0xe4, 0xd3, 0xbd, 0x61, 0xc2, 0x9f, 0x25, 0x4a, 0x94, 0x33, 0x66, 0xcc, 0x83, 0x1d, 0x3a, 
-            0x74, 0xe8, 0xcb, 0x8d, 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80, 0x1b, 0x36, 0x6c, 0xd8, 
-            0xab, 0x4d, 0x9a, 0x2f, 0x5e, 0xbc, 0x63, 0xc6, 0x97, 0x35, 0x6a, 0xd4, 0xb3, 0x7d, 0xfa, 0xef, 
-            0xc5, 0x91, 0x39, 0x72, 0xe4, 0xd3, 0xbd, 0x61, 0xc2, 0x9f, 0x25, 0x4a, 0x94, 0x33, 0x66, 0xcc, 
-            0x83, 0x1d, 0x3a, 0x74, 0xe8, 0xcb, 0x8d, 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80, 0x1b, 
-            0x36, 0x6c, 0xd8, 0xab, 0x4d, 0x9a, 0x2f, 0x5e, 0xbc, 0x63, 0xc6, 0x97, 0x35, 0x6a, 0xd4, 0xb3, 
-            0x7d, 0xfa, 0xef, 0xc5, 0x91, 0x39, 0x72, 0xe4, 0xd3, 0xbd, 0x61, 0xc2, 0x9f, 0x25, 0x4a, 0x94, 
-            0x33, 0x66, 0xcc, 0x83, 0x1d, 0x3a, 0x74, 0xe8, 0xcb, 0x8d, 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 
-            0x40, 0x80, 0x1b, 0x36, 0x6c, 0xd8, 0xab, 0x4d, 0x9a, 0x2f, 0x5e, 0xbc, 0x63, 0xc6, 0x97, 0x35, 
-            0x6a, 0xd4, 0xb3, 0x7d, 0xfa, 0xef, 0xc5, 0x91, 0x39, 0x72, 0xe4, 0xd3, 0xbd, 0x61, 0xc2, 0x9f, 
-            0x25, 0x4a, 0x94, 0x33, 0x66, 0xcc, 0x83, 0x1d, 0x3a, 0x74, 0xe8, 0xcb, 0x8d, 0x01, 0x02, 0x04, 
-            0x08, 0x10, 0x20, 0x40, 0x80, 0x1b, 0x36, 0x6c, 0xd8, 0xab, 0x4d, 0x9a, 0x2f, 0x5e, 0xbc, 0x63, 
-            0xc6, 0x97, 0x35, 0x6a, 0xd4, 0xb3, 0x7d, 0xfa, 0xef, 0xc5, 0x91, 0x39, 0x72, 0xe4, 0xd3, 0xbd, 
-            0x61, 0xc2, 0x9f, 0x25, 0x4a, 0x94, 0x33, 0x66, 0xcc, 0x83, 0x1d, 0x3a, 0x74, 0xe8, 0xcb, 0x8d
-        ]
-
-        r = Binary(format(rcon[i], '02x'), 16)
+        r = Binary(RCON[i], 10, 8)
 
         return byte ^ r
 
-    @classmethod
-    def sbox(cls, line):
-        sbox = [
-            0x63, 0x7C, 0x77, 0x7B, 0xF2, 0x6B, 0x6F, 0xC5, 0x30, 0x01, 0x67, 0x2B, 0xFE, 0xD7, 0xAB, 0x76,
-            0xCA, 0x82, 0xC9, 0x7D, 0xFA, 0x59, 0x47, 0xF0, 0xAD, 0xD4, 0xA2, 0xAF, 0x9C, 0xA4, 0x72, 0xC0,
-            0xB7, 0xFD, 0x93, 0x26, 0x36, 0x3F, 0xF7, 0xCC, 0x34, 0xA5, 0xE5, 0xF1, 0x71, 0xD8, 0x31, 0x15,
-            0x04, 0xC7, 0x23, 0xC3, 0x18, 0x96, 0x05, 0x9A, 0x07, 0x12, 0x80, 0xE2, 0xEB, 0x27, 0xB2, 0x75,
-            0x09, 0x83, 0x2C, 0x1A, 0x1B, 0x6E, 0x5A, 0xA0, 0x52, 0x3B, 0xD6, 0xB3, 0x29, 0xE3, 0x2F, 0x84,
-            0x53, 0xD1, 0x00, 0xED, 0x20, 0xFC, 0xB1, 0x5B, 0x6A, 0xCB, 0xBE, 0x39, 0x4A, 0x4C, 0x58, 0xCF,
-            0xD0, 0xEF, 0xAA, 0xFB, 0x43, 0x4D, 0x33, 0x85, 0x45, 0xF9, 0x02, 0x7F, 0x50, 0x3C, 0x9F, 0xA8,
-            0x51, 0xA3, 0x40, 0x8F, 0x92, 0x9D, 0x38, 0xF5, 0xBC, 0xB6, 0xDA, 0x21, 0x10, 0xFF, 0xF3, 0xD2,
-            0xCD, 0x0C, 0x13, 0xEC, 0x5F, 0x97, 0x44, 0x17, 0xC4, 0xA7, 0x7E, 0x3D, 0x64, 0x5D, 0x19, 0x73,
-            0x60, 0x81, 0x4F, 0xDC, 0x22, 0x2A, 0x90, 0x88, 0x46, 0xEE, 0xB8, 0x14, 0xDE, 0x5E, 0x0B, 0xDB,
-            0xE0, 0x32, 0x3A, 0x0A, 0x49, 0x06, 0x24, 0x5C, 0xC2, 0xD3, 0xAC, 0x62, 0x91, 0x95, 0xE4, 0x79,
-            0xE7, 0xC8, 0x37, 0x6D, 0x8D, 0xD5, 0x4E, 0xA9, 0x6C, 0x56, 0xF4, 0xEA, 0x65, 0x7A, 0xAE, 0x08,
-            0xBA, 0x78, 0x25, 0x2E, 0x1C, 0xA6, 0xB4, 0xC6, 0xE8, 0xDD, 0x74, 0x1F, 0x4B, 0xBD, 0x8B, 0x8A,
-            0x70, 0x3E, 0xB5, 0x66, 0x48, 0x03, 0xF6, 0x0E, 0x61, 0x35, 0x57, 0xB9, 0x86, 0xC1, 0x1D, 0x9E,
-            0xE1, 0xF8, 0x98, 0x11, 0x69, 0xD9, 0x8E, 0x94, 0x9B, 0x1E, 0x87, 0xE9, 0xCE, 0x55, 0x28, 0xDF,
-            0x8C, 0xA1, 0x89, 0x0D, 0xBF, 0xE6, 0x42, 0x68, 0x41, 0x99, 0x2D, 0x0F, 0xB0, 0x54, 0xBB, 0x16
-        ]
-
-        result = []
-
-        for byte in line:
-            result.append(Binary(format(sbox[byte.toDec()], '02x'), 16))
-
-        return Line('', result)
-
-    @classmethod
-    def sbox_inv(cls, line):
-        sbox = [
-            0x52, 0x09, 0x6A, 0xD5, 0x30, 0x36, 0xA5, 0x38, 0xBF, 0x40, 0xA3, 0x9E, 0x81, 0xF3, 0xD7, 0xFB,
-            0x7C, 0xE3, 0x39, 0x82, 0x9B, 0x2F, 0xFF, 0x87, 0x34, 0x8E, 0x43, 0x44, 0xC4, 0xDE, 0xE9, 0xCB,
-            0x54, 0x7B, 0x94, 0x32, 0xA6, 0xC2, 0x23, 0x3D, 0xEE, 0x4C, 0x95, 0x0B, 0x42, 0xFA, 0xC3, 0x4E,
-            0x08, 0x2E, 0xA1, 0x66, 0x28, 0xD9, 0x24, 0xB2, 0x76, 0x5B, 0xA2, 0x49, 0x6D, 0x8B, 0xD1, 0x25,
-            0x72, 0xF8, 0xF6, 0x64, 0x86, 0x68, 0x98, 0x16, 0xD4, 0xA4, 0x5C, 0xCC, 0x5D, 0x65, 0xB6, 0x92,
-            0x6C, 0x70, 0x48, 0x50, 0xFD, 0xED, 0xB9, 0xDA, 0x5E, 0x15, 0x46, 0x57, 0xA7, 0x8D, 0x9D, 0x84,
-            0x90, 0xD8, 0xAB, 0x00, 0x8C, 0xBC, 0xD3, 0x0A, 0xF7, 0xE4, 0x58, 0x05, 0xB8, 0xB3, 0x45, 0x06,
-            0xD0, 0x2C, 0x1E, 0x8F, 0xCA, 0x3F, 0x0F, 0x02, 0xC1, 0xAF, 0xBD, 0x03, 0x01, 0x13, 0x8A, 0x6B,
-            0x3A, 0x91, 0x11, 0x41, 0x4F, 0x67, 0xDC, 0xEA, 0x97, 0xF2, 0xCF, 0xCE, 0xF0, 0xB4, 0xE6, 0x73,
-            0x96, 0xAC, 0x74, 0x22, 0xE7, 0xAD, 0x35, 0x85, 0xE2, 0xF9, 0x37, 0xE8, 0x1C, 0x75, 0xDF, 0x6E,
-            0x47, 0xF1, 0x1A, 0x71, 0x1D, 0x29, 0xC5, 0x89, 0x6F, 0xB7, 0x62, 0x0E, 0xAA, 0x18, 0xBE, 0x1B,
-            0xFC, 0x56, 0x3E, 0x4B, 0xC6, 0xD2, 0x79, 0x20, 0x9A, 0xDB, 0xC0, 0xFE, 0x78, 0xCD, 0x5A, 0xF4,
-            0x1F, 0xDD, 0xA8, 0x33, 0x88, 0x07, 0xC7, 0x31, 0xB1, 0x12, 0x10, 0x59, 0x27, 0x80, 0xEC, 0x5F,
-            0x60, 0x51, 0x7F, 0xA9, 0x19, 0xB5, 0x4A, 0x0D, 0x2D, 0xE5, 0x7A, 0x9F, 0x93, 0xC9, 0x9C, 0xEF,
-            0xA0, 0xE0, 0x3B, 0x4D, 0xAE, 0x2A, 0xF5, 0xB0, 0xC8, 0xEB, 0xBB, 0x3C, 0x83, 0x53, 0x99, 0x61,
-            0x17, 0x2B, 0x04, 0x7E, 0xBA, 0x77, 0xD6, 0x26, 0xE1, 0x69, 0x14, 0x63, 0x55, 0x21, 0x0C, 0x7D
-        ]
-
-        result = []
-
-        for byte in line:
-            result.append(Binary(format(sbox[byte.toDec()], '02x'), 16))
-
-        return Line('', result)
-
     @classmethod
     def keySchedule(cls, key):
-        def keyScheduleCore(i, line):
-            result = cls.sbox(line.rotate())
-            result[0] = cls.rcon(i, result[0])
-            return result
-
-        def getPreviousLine(states):
-            nStates = len(states)
-            nLines = states[nStates - 1].lenLines()
-            return states[nStates - 1][nLines - 1]
-
-        def getnTimesBeforeLine(states, n):
-            lineIteration = int(n / 4)
-            nStates = len(states)
-            nLines = states[nStates - 1].lenLines()
-
-            for s in range(nStates - 1, -1, -1):
-                for l in range(states[s].lenLines() - 1, -1, -1):
-                    lineIteration -= 1
-                    if lineIteration == 0:
-                        return states[s][l]
-
-        keySize = len(key[0]) * 8
-        n = 16 #bytes for 128-bit key value
-        b = 176 #bytes for 128-bit key value
-        rcon = 1
-        expandedKey = copy.deepcopy(key)
-
-        while cls.bytesInStates(expandedKey) < b:
-            t = copy.deepcopy(getPreviousLine(expandedKey))
-            t = keyScheduleCore(rcon, t)
-            rcon += 1
-            t = t ^ getnTimesBeforeLine(expandedKey, n)
-
-            expandedKey.append(State('', keySize, [copy.deepcopy(t)]))
+        # round keys as 128-bit States, key being split in States by getStates
+        keyBytes = b''.join(Binary(state.getData()).toBytes() for state in key)
+        roundKeys = keyExpansion(keyBytes)
+        states = []
 
-            for i in range(3):
-                t = copy.deepcopy(getPreviousLine(expandedKey))
-                t = t ^ getnTimesBeforeLine(expandedKey, n)
-                expandedKey[len(expandedKey) - 1].append(copy.deepcopy(t))
+        for i in range(0, len(roundKeys), 4):
+            states.append(State(Binary(struct.pack('>4I', *roundKeys[i:i + 4]), 256), 128))
 
-        return expandedKey
+        return states
 
     @classmethod
     def subBytes(cls, state):
-        for line in range(state.lenLines()):
-            state[line] = cls.sbox(state[line])
+        state.subBytes()
 
     @classmethod
     def subBytes_inv(cls, state):
-        for line in range(state.lenLines()):
-            state[line] = cls.sbox_inv(state[line])
-
-    @classmethod
-    def shiftRow(cls, state, row):
-        temp = copy.deepcopy(state[0][row])
-        state[0][row] = state[1][row]
-        state[1][row] = state[2][row]
-        state[2][row] = state[3][row]
-        state[3][row] = temp
-    
-    @classmethod
-    def shiftRow_inv(cls, state, row):
-        temp = copy.deepcopy(state[3][row])
-        state[3][row] = state[2][row]
-        state[2][row] = state[1][row]
-        state[1][row] = state[0][row]
-        state[0][row] = temp
+        state.subBytes_inv()
 
     @classmethod
     def shiftRows(cls, state):
-        for row in range(state.lenLines()):
-            for shift in range(0, row):
-                cls.shiftRow(state, row)
-    
+        state.shiftRows()
+
     @classmethod
     def shiftRows_inv(cls, state):
-        for row in range(state.lenLines()):
-            for shift in range(0, row):
-                cls.shiftRow_inv(state, row)
+        state.shiftRows_inv()
 
     @classmethod
     def mixColumns(cls, state):
-        matrix = [
-            [ 2, 1, 1, 3 ],
-            [ 3, 2, 1, 1 ],
-            [ 1, 3, 2, 1 ],
-            [ 1, 1, 3, 2 ]
-        ]
-
-        state = state.mul(matrix)
+        state.mixColumns()
 
     @classmethod
     def mixColumns_inv(cls, state):
-        matrix = [
-            [ 14, 9, 13, 11 ],
-            [ 11, 14, 9, 13 ],
-            [ 13, 11, 14, 9 ],
-            [ 9, 13, 11, 14 ]
-        ]
-
-        state = state.mul(matrix)
+        state.mixColumns_inv()
     
     @classmethod
     def removePadding(cls, text):
@@ -803,118 +1940,99 @@ class Crypto:
         return text
 
     def encAES(self, state, key):
-        cipherText = ''
-        keySize = len(key)
-
-        if not len(self.roundKeys):
-            self.roundKeys = self.keySchedule(self.getStates(key, keySize))
+        # steps through the rounds on an in-place AESState; a State is
+        # converted to one and back
+        roundKeys, decKeys, rounds = self.expandKey(key)
+        keyBytes = struct.pack('>{}I'.format(len(roundKeys)), *roundKeys)
+        block = state if isinstance(state, AESState) else AESState.fromState(state)
 
-        if keySize == 128:
-            rounds = 10
-        elif keySize == 192:
-            rounds = 12
-        elif keySize == 256:
-            rounds = 14
-
-        state = state ^ self.roundKeys[0]
+        block.addRoundKey(keyBytes)
 
         for round in range(1, rounds + 1):
+            self.subBytes(block)
+            self.shiftRows(block)
 
-            self.subBytes(state)
+            if round < rounds:
+                self.mixColumns(block)
 
-            self.shiftRows(state)
+            block.addRoundKey(keyBytes, 16 * round)
 
-            if round < rounds:
-                self.mixColumns(state)
-            
-            state = state ^ self.roundKeys[round]
+        return block if block is state else block.toState()
 
-        return state
+    @classmethod
+    def encAES_batch(cls, blocks, key, batchSize=BITSLICE_BATCH):
+        # encrypts every 16-byte block of blocks independently (no padding),
+        # bitsliced batchSize blocks at a time
+        if len(blocks) % 128:
+            raise ValueError('Batch must hold whole blocks (has {} bits)'.format(len(blocks)))
+
+        roundKeys, decKeys, rounds = cls.expandKey(key)
+        return Binary(bitslicedEncrypt(blocks.toBytes(), roundKeys, rounds, batchSize), 256)
 
     def decAES(self, state, key):
-        cipherText = ''
-        keySize = len(key)
+        roundKeys, decKeys, rounds = self.expandKey(key)
+        keyBytes = struct.pack('>{}I'.format(len(roundKeys)), *roundKeys)
+        block = state if isinstance(state, AESState) else AESState.fromState(state)
 
-        if not len(self.roundKeys):
-            self.roundKeys = self.keySchedule(self.getStates(key, keySize))
+        block.addRoundKey(keyBytes, 16 * rounds)
+        self.shiftRows_inv(block)
+        self.subBytes_inv(block)
 
-        if keySize == 128:
-            rounds = 10
-        elif keySize == 192:
-            rounds = 12
-        elif keySize == 256:
-            rounds = 14
+        for round in range(rounds - 1, 0, -1):
+            block.addRoundKey(keyBytes, 16 * round)
+            self.mixColumns_inv(block)
+            self.shiftRows_inv(block)
+            self.subBytes_inv(block)
 
-        state = state ^ self.roundKeys[rounds]
-        self.shiftRows_inv(state)
-        self.subBytes_inv(state)
+        block.addRoundKey(keyBytes)
 
-        for round in range(rounds - 1, 0, -1):
-            state = state ^ self.roundKeys[round]
-            self.mixColumns_inv(state)
-            self.shiftRows_inv(state)
-            self.subBytes_inv(state)
+        return block if block is state else block.toState()
 
-            
-        state = state ^ self.roundKeys[0]
-        
-        return state
+    @classmethod
+    def expandKey(cls, key):
+        # round keys as 32-bit words for encryptBlocks/decryptBlocks
+        return cachedKeySchedule(key.toBytes(), len(key))
 
+    def paddedBlocks(self):
+        data = self.data
 
-    def encAES_ECB(self, key):
-        keySize = len(key)
-        plainTextstates = self.getStates(self.data, keySize)
-        data = ''
+        if len(data) % 128:
+            data = data.pkcs_7(len(data) + 128 - len(data) % 128)
 
-        for state in plainTextstates:
-            data += self.encAES(state, key).getData()
+        return data.toBytes()
 
-        self.data = Binary(data)
+    def encAES_ECB(self, key):
+        roundKeys, decKeys, rounds = self.expandKey(key)
+        self.data = Binary(aesEncrypt(self.paddedBlocks(), roundKeys, rounds), 256)
     
     def decAES_ECB(self, key):
-        keySize = len(key)
-        cipherTextStates = self.getStates(self.data, keySize)
-        data = ''
-
-        for state in cipherTextStates:
-            data += self.decAES(state, key).getData()
-        
+        roundKeys, decKeys, rounds = self.expandKey(key)
+        data = Binary(aesDecrypt(self.data.toBytes(), decKeys, rounds), 256)
         self.data = Binary(self.removePadding(data))
 
     def encAES_CBC(self, key, IV):
-        keySize = len(key)
-        plainTextstates = self.getStates(self.data, keySize)
-        IVstate = State(str(IV), keySize)
-        data = ''
+        roundKeys, decKeys, rounds = self.expandKey(key)
+        self.data = Binary(encryptBlocks(self.paddedBlocks(), roundKeys, rounds, IV.toBytes()), 256)
 
-        plainTextstates[0] = plainTextstates[0] ^ IVstate
+    def decAES_CBC(self, key, IV):
+        roundKeys, decKeys, rounds = self.expandKey(key)
+        plainText = decryptCBC(self.data.toBytes(), decKeys, rounds, IV.toBytes())
+        self.data = Binary(self.removePadding(Binary(plainText, 256)))
 
-        for i in range(len(plainTextstates)):
-            newState = self.encAES(plainTextstates[i], key)
-            data += newState.getData()
-            
-            if i < len(plainTextstates) - 1:
-                plainTextstates[i+1] = plainTextstates[i+1] ^ newState
-        
-        self.data = Binary(data)
+    @classmethod
+    def cipherAES_ECB(cls, key):
+        return AESCipher(key)
 
-    def decAES_CBC(self, key, IV):
-        keySize = len(key)
-        cipherTextStates = self.getStates(self.data, keySize)
-        IVstate = State(str(IV), keySize)
-        data = ''
+    @classmethod
+    def cipherAES_CBC(cls, key, IV):
+        return AESCipher(key, IV)
 
-        for i in range(len(cipherTextStates) - 1, -1, -1):
-            newState = self.decAES(cipherTextStates[i], key)
-            
-            if i == 0:
-                data = (newState ^ IVstate).getData() + data
-            elif i == len(cipherTextStates) - 1:
-                data = self.removePadding((cipherTextStates[i-1] ^ newState).getData())
-            else:
-                data = (cipherTextStates[i-1] ^ newState).getData() + data
-            
-        self.data = Binary(data)
+    def encAES_CTR(self, key, nonce=None, counterFormat='<Q', counter=0):
+        self.data = Binary(bytes(AESCounter(key, nonce, counterFormat, counter).apply(self.data.toBytes())), 256)
+
+    def decAES_CTR(self, key, nonce=None, counterFormat='<Q', counter=0):
+        # CTR decryption is the same keystream XOR
+        self.encAES_CTR(key, nonce, counterFormat, counter)
 
     @classmethod
     def getBlockSize(cls, oracle):
@@ -936,24 +2054,49 @@ class Crypto:
     @classmethod
     def detectMode(cls, oracle):
         cipher = oracle(Binary('A'*16*10, 128))
-        blocks = [Binary(cipher[x:x+8*16]) for x in range(0, len(cipher), 8*16)]
-        repeated = 0
-
-        i = 0
-        while i < len(blocks) - 1:
-            ii = i + 1
-            while ii < len(blocks):
-                if blocks[i] == blocks[ii]:
-                    blocks = blocks[:ii] + blocks[ii+1:len(blocks)]
-                    repeated += 1
-                    ii -= 1
-                ii += 1
-            i += 1
-
-        if not repeated:
+        duplicates, ratio = cls.blockRepetition(cipher)
+
+        if not duplicates:
             return 'CBC'
         return 'ECB'
 
+    @classmethod
+    def blockRepetition(cls, data, blockSize=128):
+        # ECB fingerprint in one pass over hashed block views: the number of
+        # blocks repeating an earlier one and their share of all blocks.
+        # Blocks off byte boundaries are copies, counted by length and bytes
+        counts = collections.Counter([
+            block if isinstance(block, BinaryView) else (len(block), block.toBytes())
+            for block in data.iterBlocks(blockSize)
+        ])
+        blocks = sum(counts.values())
+
+        if not blocks:
+            return (0, 0.0)
+
+        duplicates = blocks - len(counts)
+        return (duplicates, duplicates / blocks)
+
+    @classmethod
+    def rankECB(cls, corpus, top=10, blockSize=128):
+        # streams the records of a Corpus through blockRepetition and returns
+        # the top ECB suspects as (duplicates, ratio, line), highest ratio first
+        heap = []
+
+        for i, data in corpus.iterRecords():
+            duplicates, ratio = cls.blockRepetition(data, blockSize)
+
+            if not duplicates:
+                continue
+
+            entry = (ratio, duplicates, -i)
+            if len(heap) < top:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+        return [(duplicates, ratio, -line) for ratio, duplicates, line in sorted(heap, reverse=True)]
+
     @classmethod
     def decECB(cls, oracle):
         blockSize = cls.getBlockSize(oracle)
@@ -972,7 +2115,7 @@ class Crypto:
         while proceed:
             word += Binary('A', 128)
             cipher = oracle(word)
-            blocks = [cipher[i:i + blockSize] for i in range(0, len(cipher), blockSize)]
+            blocks = list(cipher.iterBlocks(blockSize))
 
             for i in range(len(blocks) - 1):
                 blockCount = 1
@@ -1029,6 +2172,115 @@ class Crypto:
                 elif not found:
                     return plainText
 
+    @classmethod
+    def runFileJob(cls, inPath, outPath, key, operation='encAES_ECB', IV=None, workers=None, shardSize=SHARD_SIZE):
+        # runs encAES_ECB, decAES_ECB or decAES_CBC over the raw bytes of
+        # inPath into outPath, block-aligned shards going to a process pool
+        # (one shard runs in this process). Returns the output length
+        if operation not in SHARD_OPERATIONS:
+            raise ValueError('Unsupported file job {}'.format(operation))
+
+        if operation == 'decAES_CBC' and IV is None:
+            raise ValueError('decAES_CBC needs an IV')
+
+        size = os.path.getsize(inPath)
+        keys = cls.expandKey(key)
+        shardSize = max(shardSize - shardSize % 16, 16)
+
+        if operation != 'encAES_ECB' and size % 16:
+            raise ValueError('Ciphertext must hold whole blocks (has {} bytes)'.format(size))
+
+        with open(outPath, 'wb') as f:
+            f.truncate(size + -size % 16)
+
+        if not size:
+            return 0
+
+        # the round keys are small enough to travel with every shard
+        IV = IV.toBytes() if IV is not None else None
+        jobs = [
+            (inPath, outPath, operation, keys, start, min(start + shardSize, size), IV, start + shardSize >= size)
+            for start in range(0, size, shardSize)
+        ]
+
+        if len(jobs) == 1:
+            results = [runShard(*jobs[0])]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(runShard, *zip(*jobs)))
+
+        # only the final shard's length changes, through padding
+        length = results[-1]
+        if length != size + -size % 16:
+            with open(outPath, 'r+b') as f:
+                f.truncate(length)
+
+        return length
+
+    @classmethod
+    def decCBCPaddingOracle(cls, oracle, cipherText, IV, workers=1):
+        # CBC padding oracle attack, oracle(cipherText, IV) telling whether a
+        # ciphertext decrypts to valid PKCS#7 padding. Every block is recovered
+        # by forging the block before it, concurrently with workers > 1.
+        # Returns the unpadded plaintext and the number of oracle queries
+        data = cipherText.toBytes()
+        blocks = [data[i:i + 16] for i in range(0, len(data), 16)]
+        previous = [IV.toBytes()] + blocks[:-1]
+        # the last block ends in padding, so its pad values are tried first
+        pads = bytes(range(1, 17))
+        guesses = [PADDING_GUESSES] * (len(blocks) - 1) + [pads + PADDING_GUESSES.translate(None, pads)]
+        oracles = [oracle] * len(blocks)
+
+        if workers > 1:
+            with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+                results = list(pool.map(cls.decPaddingOracleBlock, oracles, previous, blocks, guesses))
+        else:
+            results = list(map(cls.decPaddingOracleBlock, oracles, previous, blocks, guesses))
+
+        plainText = Binary(b''.join([block for block, queries in results]), 256)
+        return (Binary(cls.removePadding(plainText)), sum([queries for block, queries in results]))
+
+    @classmethod
+    def decPaddingOracleBlock(cls, oracle, previous, block, guesses=PADDING_GUESSES):
+        cipher = Binary(block, 256)
+        intermediate = bytearray(16)
+        forged = bytearray(16)
+        queries = 0
+        order = guesses
+
+        for position in range(15, -1, -1):
+            pad = 16 - position
+
+            for j in range(position + 1, 16):
+                forged[j] = intermediate[j] ^ pad
+
+            for guess in order:
+                forged[position] = previous[position] ^ guess ^ pad
+                queries += 1
+
+                if not oracle(cipher, Binary(bytes(forged), 256)):
+                    continue
+
+                if pad == 1:
+                    # the pad may really be 02 02 (or longer) by chance:
+                    # changing the byte before keeps only a true 01 valid
+                    forged[position - 1] ^= 1
+                    queries += 1
+                    genuine = oracle(cipher, Binary(bytes(forged), 256))
+                    forged[position - 1] ^= 1
+
+                    if not genuine:
+                        continue
+
+                intermediate[position] = forged[position] ^ pad
+                # the byte just recovered comes first next: pads and letters repeat
+                order = bytes([guess]) + guesses.replace(bytes([guess]), b'')
+                break
+            else:
+                raise Exception('No valid padding found')
+
+        return (bytes([i ^ p for i, p in zip(intermediate, previous)]), queries)
+
     #-----------------------------------
     #               TO
     #-----------------------------------
@@ -1041,3 +2293,97 @@ class Crypto:
 
     def toAscii(self):
         return self.data.toAscii()
+
+@functools.lru_cache(maxsize=KEY_CACHE_SIZE)
+def cachedKeySchedule(key, keySize):
+    # key schedule shared by every Crypto instance, keyed by the key bytes:
+    # the encryption and decryption round keys as words plus the number of
+    # rounds. cachedKeySchedule.cache_info() reports hits and misses
+    if keySize not in AES_ROUNDS:
+        raise ValueError('Key must have 128, 192 or 256 bits (has {})'.format(keySize))
+
+    rounds = AES_ROUNDS[keySize]
+    roundKeys = keyExpansion(key)
+
+    return (tuple(roundKeys), tuple(decryptionKeys(roundKeys, rounds)), rounds)
+
+#-----------------------------------
+#            FILE JOBS
+#-----------------------------------
+
+SHARD_OPERATIONS = ('encAES_ECB', 'decAES_ECB', 'decAES_CBC')
+
+def runShard(inPath, outPath, operation, keys, start, stop, IV, final):
+    # one shard of Crypto.runFileJob, written in place into the preallocated
+    # output. Returns where the shard's output ends
+    roundKeys, decKeys, rounds = keys
+    offset = 16 if operation == 'decAES_CBC' and start else 0
+
+    with open(inPath, 'rb') as f:
+        f.seek(start - offset)
+        data = f.read(stop - start + offset)
+
+    if operation == 'encAES_ECB':
+        if final:
+            data = Crypto(Binary(data, 256)).paddedBlocks()
+        result = aesEncrypt(data, roundKeys, rounds)
+    elif operation == 'decAES_ECB':
+        result = aesDecrypt(data, decKeys, rounds)
+    else:
+        # CBC blocks are chained to the ciphertext block before them
+        result = decryptCBC(data[offset:], decKeys, rounds, data[:16] if offset else IV)
+
+    if final and operation != 'encAES_ECB':
+        result = Crypto.removePadding(Binary(result, 256)).toBytes()
+
+    with open(outPath, 'r+b') as f:
+        out = mmap.mmap(f.fileno(), 0)
+        out[start:start + len(result)] = result
+        out.close()
+
+    return start + len(result)
+
+#-----------------------------------
+#           CORPUS JOBS
+#-----------------------------------
+
+# corpus of the running detection, set once per pool worker process
+corpusRecords = None
+
+def initCorpusWorker(corpus):
+    global corpusRecords
+    corpusRecords = corpus
+
+def scoreRecords(start, stop, top, maxDistinct, corpus=None):
+    # one chunk of Crypto.detectSingleCharXOR, as a heap of its best top
+    # records, over the given corpus or the worker's. Lines are negated so
+    # that ties rank the earlier line first
+    heap = []
+    corpus = corpusRecords if corpus is None else corpus
+
+    for i, data in corpus.iterRecords(start, stop):
+        # blank lines would score 1 with any key
+        if not len(data) or not Crypto.couldBeSingleCharXOR(data, maxDistinct):
+            continue
+
+        score, key, plainText = Crypto(data).decSingleCharXOR()
+
+        if not score:
+            continue
+
+        entry = (score, -i, key, plainText)
+        if len(heap) < top:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    return heap
+
+def solveColumn(column):
+    # (score, key) of one transposed column of Crypto.rankXORKeys
+    data = Binary(column, 256)
+
+    if not Crypto.couldBeSingleCharXOR(data, 256):
+        return (0, '')
+
+    return Crypto(data).decSingleCharXOR()[:2]
@@ -0,0 +1,227 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from Tools import Binary, Line, State, AESState, Crypto, Corpus, xorBytes, intToBytes, bytesToInt, encryptBlocks, decryptBlocks, bitslicedEncrypt, numpyEncryptBlocks, numpyDecryptBlocks, numpy
+
+#-----------------------------------
+#             MEMORY
+#-----------------------------------
+
+def footprint(factory, n=2000):
+    objects = [None] * n
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    for i in range(n):
+        objects[i] = factory()
+
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return (after - before) / n
+
+def memory():
+    block = '01' * 64
+
+    cases = [
+        ('Binary (1 byte)', lambda: Binary('01000001')),
+        ('Binary (16 bytes)', lambda: Binary(block)),
+        ('Line (4 bytes)', lambda: Line(block[:32])),
+        ('State (16-byte block)', lambda: State(block, 128)),
+        ('getStates (1 KiB)', lambda: Crypto.getStates(Binary('41' * 1024, 16), 128)),
+    ]
+
+    print('{:<24} {:>12}'.format('object', 'bytes/object'))
+
+    for name, factory in cases:
+        n = 50 if '1 KiB' in name else 2000
+        print('{:<24} {:>12.0f}'.format(name, footprint(factory, n)))
+
+#-----------------------------------
+#               XOR
+#-----------------------------------
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return (time.perf_counter() - start, result)
+
+def xor():
+    size = 100 * 1024 * 1024
+    data = os.urandom(size)
+    key = b'ICE'
+    out = bytearray(size)
+
+    print('xorBytes into buffer (100 MiB): {:.3f}s'.format(timed(xorBytes, data, key, out)[0]))
+    print('xorBytes in place (100 MiB):    {:.3f}s'.format(timed(xorBytes, out, key, out)[0]))
+    print('Binary ^ Binary (100 MiB):      {:.3f}s'.format(timed(Binary.__xor__, Binary(data, 256), Binary(key, 256))[0]))
+
+#-----------------------------------
+#             INTEGER
+#-----------------------------------
+
+def integer():
+    n = int.from_bytes(os.urandom(512), 'big') | 1 << 4095
+    rounds = 10000
+
+    start = time.perf_counter()
+    for i in range(rounds):
+        bytesToInt(intToBytes(n, 512))
+    print('intToBytes/bytesToInt (4096 bits): {:.2f}us'.format((time.perf_counter() - start) / rounds * 1e6))
+
+    start = time.perf_counter()
+    for i in range(rounds):
+        Binary(n, 10, 4096).buffer
+    print('Binary(n, 10, 4096):               {:.2f}us'.format((time.perf_counter() - start) / rounds * 1e6))
+
+    start = time.perf_counter()
+    for i in range(rounds):
+        Binary(intToBytes(n), 256).toDec()
+    print('Binary.toDec (4096 bits):          {:.2f}us'.format((time.perf_counter() - start) / rounds * 1e6))
+
+#-----------------------------------
+#              RANDOM
+#-----------------------------------
+
+def randomKeys():
+    rounds = 100000
+
+    start = time.perf_counter()
+    for i in range(rounds):
+        Binary.random(8*16)
+    print('Binary.random(128) x {}: {:.3f}s'.format(rounds, time.perf_counter() - start))
+
+#-----------------------------------
+#               AES
+#-----------------------------------
+
+def aes():
+    key = Binary('YELLOW SUBMARINE', 128)
+    roundKeys, decKeys, rounds = Crypto.expandKey(key)
+
+    c = Crypto(Binary(os.urandom(16 * 20), 256))
+    states = c.getStates(c.data, 128)
+    start = time.perf_counter()
+    for state in states:
+        c.encAES(state, key)
+    stateSpeed = len(states) / (time.perf_counter() - start)
+
+    block = AESState(os.urandom(16))
+    start = time.perf_counter()
+    for i in range(2000):
+        c.encAES(block, key)
+    blockSpeed = 2000 / (time.perf_counter() - start)
+
+    data = os.urandom(16 * 20000)
+    elapsed = timed(encryptBlocks, data, roundKeys, rounds)[0]
+    encSpeed = 20000 / elapsed
+    elapsed = timed(decryptBlocks, data, decKeys, rounds)[0]
+    decSpeed = 20000 / elapsed
+
+    print('State engine:           {:>10.0f} blocks/s'.format(stateSpeed))
+    print('AESState engine:        {:>10.0f} blocks/s ({:.0f}x)'.format(blockSpeed, blockSpeed / stateSpeed))
+    print('T-table encryptBlocks:  {:>10.0f} blocks/s ({:.0f}x)'.format(encSpeed, encSpeed / stateSpeed))
+    print('T-table decryptBlocks:  {:>10.0f} blocks/s ({:.0f}x)'.format(decSpeed, decSpeed / stateSpeed))
+
+    if numpy is not None:
+        elapsed = timed(numpyEncryptBlocks, data, roundKeys, rounds)[0]
+        print('numpy encryptBlocks:    {:>10.0f} blocks/s ({:.0f}x)'.format(20000 / elapsed, 20000 / elapsed / stateSpeed))
+        elapsed = timed(numpyDecryptBlocks, data, decKeys, rounds)[0]
+        print('numpy decryptBlocks:    {:>10.0f} blocks/s ({:.0f}x)'.format(20000 / elapsed, 20000 / elapsed / stateSpeed))
+
+    for batchSize in (64, 256, 1024, 4096):
+        elapsed = timed(bitslicedEncrypt, data, roundKeys, rounds, batchSize)[0]
+        batchSpeed = 20000 / elapsed
+        print('Bitsliced x{:<5}        {:>10.0f} blocks/s ({:.0f}x, {:.1f}x T-table)'.format(
+            batchSize, batchSpeed, batchSpeed / stateSpeed, batchSpeed / encSpeed))
+
+#-----------------------------------
+#            FILE JOBS
+#-----------------------------------
+
+def fileJobs():
+    key = Binary('YELLOW SUBMARINE', 128)
+    size = 32 * 1024 * 1024
+
+    with tempfile.TemporaryDirectory() as directory:
+        inPath = os.path.join(directory, 'plain')
+        outPath = os.path.join(directory, 'cipher')
+
+        with open(inPath, 'wb') as f:
+            f.write(os.urandom(size))
+
+        for workers in sorted({1, os.cpu_count() or 1}):
+            elapsed = timed(Crypto.runFileJob, inPath, outPath, key, 'encAES_ECB', None, workers)[0]
+            print('runFileJob ECB, {:>2} workers (32 MiB): {:.3f}s'.format(workers, elapsed))
+
+#-----------------------------------
+#              CORPUS
+#-----------------------------------
+
+def corpus():
+    lines = 100000
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'corpus.txt')
+
+        with open(path, 'w') as f:
+            for i in range(lines):
+                f.write(os.urandom(30).hex() + '\n')
+
+        records = Corpus(path)
+        for workers in sorted({1, os.cpu_count() or 1}):
+            elapsed = timed(Crypto.detectSingleCharXOR, records, 10, workers)[0]
+            print('detectSingleCharXOR, {:>2} workers: {:>10.0f} lines/s'.format(workers, lines / elapsed))
+
+#-----------------------------------
+#            XOR KEYS
+#-----------------------------------
+
+def xorKeys():
+    # key recovery by decXOR for a 13-byte key (not the size the distance
+    # estimate favours) and for random keys of every length it probes
+    c = Crypto.fromFile('./ch6.txt')
+    c.xor(Binary('Terminator X: Bring the noise', 128))
+    plainText = c.data.toBytes()
+    generator = random.Random(1)
+
+    keys = [b'sdkaaauramvgn'] + [
+        bytes(generator.choice(b'abcdefghijklmnopqrstuvwxyz') for i in range(size))
+        for size in range(2, 40)
+    ]
+    sizes = exact = 0
+
+    start = time.perf_counter()
+    for key in keys:
+        found = Crypto(Binary(xorBytes(plainText, key), 256)).decXOR()[0]
+        sizes += len(found) == len(key)
+        exact += found == key.decode()
+
+    print('decXOR sizes found: {}/{}, keys found: {}/{} ({:.2f}s)'.format(
+        sizes, len(keys), exact, len(keys), time.perf_counter() - start))
+
+benchmarks = {
+    'memory': memory,
+    'xor': xor,
+    'integer': integer,
+    'random': randomKeys,
+    'aes': aes,
+    'files': fileJobs,
+    'corpus': corpus,
+    'xorkeys': xorKeys,
+}
+
+def __main__():
+    names = sys.argv[1:] or list(benchmarks)
+
+    for name in names:
+        print('--- {}'.format(name))
+        benchmarks[name]()
+
+if __name__ == "__main__":
+    __main__()
@@ -1,13 +1,7 @@
 from Tools import Binary, Crypto
 
-data = ''
 key = Binary('YELLOW SUBMARINE', 128)
-
-with open('./ch10.txt') as file:
-    for line in file:
-        data += line.rstrip()
-    
-data = Binary(data, 64)
+data = Binary.fromFile('./ch10.txt')
 
 IV = Binary('0'*32, 16)
 c = Crypto(data)
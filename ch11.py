@@ -20,21 +20,9 @@ def encryptionOracle(data):
     return (mode, c.data)
 
 def detectMode(cipher):
-    blocks = [Binary(cipher[x:x+8*16]) for x in range(0, len(cipher), 8*16)]
-    repeated = 0
-
-    i = 0
-    while i < len(blocks) - 1:
-        ii = i + 1
-        while ii < len(blocks):
-            if blocks[i] == blocks[ii]:
-                blocks = blocks[:ii] + blocks[ii+1:len(blocks)]
-                repeated += 1
-                ii -= 1
-            ii += 1
-        i += 1
-
-    if not repeated:
+    duplicates, ratio = Crypto.blockRepetition(cipher)
+
+    if not duplicates:
         return 'CBC'
     return 'ECB'
 
@@ -0,0 +1,43 @@
+from Tools import Binary, Crypto, decryptCBC
+import random
+
+# constant random key
+randomKey = Binary.random(8*16)
+
+strings = [
+    'MDAwMDAwTm93IHRoYXQgdGhlIHBhcnR5IGlzIGp1bXBpbmc=',
+    'MDAwMDAxV2l0aCB0aGUgYmFzcyBraWNrZWQgaW4gYW5kIHRoZSBWZWdhJ3MgYXJlIHB1bXBpbic=',
+    'MDAwMDAyUXVpY2sgdG8gdGhlIHBvaW50LCB0byB0aGUgcG9pbnQsIG5vIGZha2luZw==',
+    'MDAwMDAzQ29va2luZyBNQydzIGxpa2UgYSBwb3VuZCBvZiBiYWNvbg==',
+    'MDAwMDA0QnVybmluZyAnZW0sIGlmIHlvdSBhaW4ndCBxdWljayBhbmQgbmltYmxl',
+    'MDAwMDA1SSBnbyBjcmF6eSB3aGVuIEkgaGVhciBhIGN5bWJhbA==',
+    'MDAwMDA2QW5kIGEgaGlnaCBoYXQgd2l0aCBhIHNvdXBlZCB1cCB0ZW1wbw==',
+    'MDAwMDA3SSdtIG9uIGEgcm9sbCwgaXQncyB0aW1lIHRvIGdvIHNvbG8=',
+    'MDAwMDA4b2xsaW4nIGluIG15IGZpdmUgcG9pbnQgb2g=',
+    'MDAwMDA5aXRoIG15IHJhZy10b3AgZG93biBzbyBteSBoYWlyIGNhbiBibG93'
+]
+
+def encryptRandomString():
+    data = Binary(random.choice(strings), 64)
+    IV = Binary.random(8*16)
+
+    c = Crypto(data.pkcs_7(len(data) + 128 - len(data) % 128))
+    c.encAES_CBC(randomKey, IV)
+    return (c.data, IV)
+
+def paddingOracle(cipherText, IV):
+    roundKeys, decKeys, rounds = Crypto.expandKey(randomKey)
+    plainText = decryptCBC(cipherText.toBytes(), decKeys, rounds, IV.toBytes())
+    pad = plainText[-1]
+
+    return 1 <= pad <= 16 and plainText[-pad:] == bytes([pad]) * pad
+
+def __main__():
+    cipherText, IV = encryptRandomString()
+    plainText, queries = Crypto.decCBCPaddingOracle(paddingOracle, cipherText, IV, 4)
+
+    print(plainText.toAscii())
+    print('Oracle queries: {}'.format(queries))
+
+if __name__ == "__main__":
+    __main__()
\ No newline at end of file
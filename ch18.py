@@ -0,0 +1,10 @@
+from Tools import Binary, Crypto
+
+key = Binary('YELLOW SUBMARINE', 128)
+data = Binary('L77na/nrFsKvynd6HzOoG7GHTLXsTVu9qvY/2syLXzhPweyyMTJULu/6/kXX0KSvoOLSFQ==', 64)
+
+c = Crypto(data)
+
+c.decAES_CTR(key)
+
+print(c.toAscii())
\ No newline at end of file
@@ -1,15 +1,5 @@
-from Tools import Crypto
+from Tools import Crypto, Corpus
 
-with open('./ch4.txt') as file:
-    bestResult = (0, '', '')
-    i = 1
-    
-    for line in file:
-        d = Crypto(line.rstrip(), 16)
-        result = d.decSingleCharXOR()
-        
-        if result[0] > bestResult[0]:
-            bestResult = result
-        i+=1
+results = Crypto.detectSingleCharXOR(Corpus('./ch4.txt'))
 
-print(bestResult[2])
\ No newline at end of file
+print(results[0][3])
\ No newline at end of file
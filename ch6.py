@@ -1,13 +1,7 @@
 from Tools import Crypto
 from Tools import Binary
 
-data = ''
-
-with open('./ch6.txt') as file:
-    for line in file:
-        data += line.rstrip()
-
-binary = Crypto(data, 64)
+binary = Crypto.fromFile('./ch6.txt')
 keys = binary.decXOR()
 
 binary.xor(Binary(keys[0], 128))
@@ -1,21 +1,6 @@
-from Tools import Binary
+from Tools import Crypto, Corpus
 
-with open('./ch8.txt') as file:
-    lineCounter = 0
-    for line in file:
-        lineCounter += 1
-        line = line.rstrip()
-        data = Binary(line, 16)
-        repeatedGroups = 0
-        
-        step = 8 * 16 # 16 bytes
+corpus = Corpus('./ch8.txt')
 
-        for i in range(0, len(data) - step, step):
-            group = data[i:i+step]
-            for ii in range(i + step, len(data) - step, step):
-                anotherGroup = data[ii:ii+step]
-                if group == anotherGroup:
-                    repeatedGroups += 1
-
-        if repeatedGroups > 0:
-            print('Number: {}\nLine: {}\nRepeated:{}'.format(lineCounter, data.toHex(), repeatedGroups))
+for duplicates, ratio, i in Crypto.rankECB(corpus):
+    print('Number: {}\nLine: {}\nRepeated:{} ({:.0%} of blocks)'.format(i + 1, corpus[i].toHex(), duplicates, ratio))
\ No newline at end of file